@@ -0,0 +1,207 @@
+import secrets
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+import gradio as gr
+from pydantic import BaseModel, Field
+
+from config import APP_CONFIG, BATCH_CONFIG, NEARBY_CONFIG, TELEMETRY_CONFIG
+from filter_engine import ALL_VALUE
+from instrumentation import render_prometheus
+from telemetry import get_telemetry_store, parse_record
+from utils import (
+    batch_nearest_records,
+    get_district_from_location,
+    get_filter_options,
+    known_shelter_ids,
+    nearby_records,
+    recommendation_records,
+    viewport_geojson,
+)
+
+# 기계용 JSON API (지도/카드 HTML 없이 조회 결과만 반환)
+router = APIRouter(prefix="/api", tags=["shelters"])
+
+
+def _filter_query():
+    """필터 파라미터 (여러 번 줄 수 있음, 예: ?district=중구&district=종로구)
+
+    FastAPI가 Query 객체에 파라미터 정보를 기록하므로 파라미터마다 새로 만든다.
+    """
+    return Query([ALL_VALUE])
+
+
+@router.get("/nearby")
+def nearby(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius_km: float = Query(NEARBY_CONFIG["radius_km"], gt=0),
+    limit: int = Query(
+        NEARBY_CONFIG["limit"], ge=1, le=NEARBY_CONFIG["limit_range"][1]
+    ),
+    offset: int = Query(0, ge=0),
+    facility_type: list[str] = _filter_query(),
+    area_size: list[str] = _filter_query(),
+    capacity_size: list[str] = _filter_query(),
+    fan: list[str] = _filter_query(),
+    ac: list[str] = _filter_query(),
+    district: list[str] = _filter_query(),
+):
+    """주변 쉼터 목록 (반경 안에 없으면 반경을 넓혀 검색)"""
+    return nearby_records(
+        lat,
+        lon,
+        facility_type,
+        area_size,
+        capacity_size,
+        fan,
+        ac,
+        district,
+        radius_km=radius_km,
+        limit=limit,
+        offset=offset,
+    )
+
+
+@router.get("/shelters/viewport")
+def shelters_in_viewport(
+    south: float = Query(ge=-90, le=90),
+    west: float = Query(ge=-180, le=180),
+    north: float = Query(ge=-90, le=90),
+    east: float = Query(ge=-180, le=180),
+    zoom: int = Query(ge=0, le=22),
+    facility_type: list[str] = _filter_query(),
+    area_size: list[str] = _filter_query(),
+    capacity_size: list[str] = _filter_query(),
+    fan: list[str] = _filter_query(),
+    ac: list[str] = _filter_query(),
+    district: list[str] = _filter_query(),
+):
+    """보이는 영역 안 쉼터 GeoJSON (확대 수준이 낮거나 많으면 격자 칸별 쉼터 수)"""
+    if south > north or west > east:
+        raise HTTPException(
+            status_code=422, detail="south <= north, west <= east여야 합니다."
+        )
+    geojson = viewport_geojson(
+        south,
+        west,
+        north,
+        east,
+        zoom,
+        facility_type,
+        area_size,
+        capacity_size,
+        fan,
+        ac,
+        district,
+    )
+    return Response(geojson, media_type="application/geo+json")
+
+
+@router.get("/recommend")
+def recommend(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    age: int = Query(ge=0, le=150),
+    top_n: int = Query(3, ge=1, le=20),
+):
+    """나이 기준 맞춤 추천 쉼터 (가까운 순)"""
+    return {"shelters": recommendation_records(lat, lon, age, top_n)}
+
+
+class BatchPoint(BaseModel):
+    lat: float
+    lon: float
+    age: int = 0  # 60세를 넘으면 회원이용시설(경로당 등)도 포함
+
+
+class BatchNearestRequest(BaseModel):
+    points: list[BatchPoint]
+    top_n: int = Field(1, ge=1, le=20)
+
+
+@router.post("/nearest/batch")
+def nearest_batch(request: BatchNearestRequest):
+    """여러 위치 각각의 가까운 운영 중 쉼터 목록 (요청의 points 순서대로)"""
+    if len(request.points) > BATCH_CONFIG["max_points"]:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {BATCH_CONFIG['max_points']}개 위치까지 조회할 수 있습니다.",
+        )
+    points = request.points
+    results = batch_nearest_records(
+        [point.lat for point in points],
+        [point.lon for point in points],
+        [point.age for point in points],
+        request.top_n,
+    )
+    return {"results": [{"shelters": shelters} for shelters in results]}
+
+
+@router.get("/district")
+def district(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+):
+    """위치가 속한 자치구"""
+    return {"district": get_district_from_location(lat, lon)}
+
+
+@router.get("/filters")
+def filters():
+    """필터 선택지 목록"""
+    return get_filter_options()
+
+
+def _check_telemetry_token(token):
+    """설정된 토큰과 같은지 확인 (토큰이 설정되지 않았으면 API로는 받지 않음)"""
+    expected = TELEMETRY_CONFIG["api_token"]
+    if not expected:
+        raise HTTPException(
+            status_code=403,
+            detail="측정값 API가 꺼져 있습니다 (SHELTER_TELEMETRY_TOKEN 설정 필요).",
+        )
+    if token is None or not secrets.compare_digest(
+        token.encode("utf-8"), expected.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=401, detail="측정값 API 토큰이 올바르지 않습니다."
+        )
+
+
+@router.post("/telemetry")
+def telemetry(records: list[dict], x_telemetry_token: str | None = Header(None)):
+    """실시간 온도/사용자 수 측정값 반영 (telemetry.TelemetryStore.ingest 형식)
+
+    X-Telemetry-Token 헤더가 TELEMETRY_CONFIG["api_token"]과 같아야 한다.
+    """
+    _check_telemetry_token(x_telemetry_token)
+    # 잘못된 레코드나 데이터셋에 없는 쉼터가 하나라도 있으면 아무것도 반영하지 않고 거부
+    parsed = [parse_record(record) for record in records]
+    invalid = [i for i, values in enumerate(parsed) if values is None]
+    if invalid:
+        raise HTTPException(
+            status_code=422,
+            detail=f"잘못된 측정값 레코드 (순번): {invalid[:20]}",
+        )
+    known = known_shelter_ids([values[0] for values in parsed])
+    unknown = [i for i, found in enumerate(known) if not found]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"데이터셋에 없는 쉼터 ID (순번): {unknown[:20]}",
+        )
+    return {"accepted": get_telemetry_store().ingest(records)}
+
+
+def create_app(demo):
+    """JSON API와 Gradio UI를 함께 제공하는 FastAPI 앱 생성"""
+    app = FastAPI(title=APP_CONFIG["title"])
+    app.include_router(router)
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics():
+        """단계별 실행 시간/행 수/출력 크기 (Prometheus 텍스트 형식)"""
+        return render_prometheus()
+
+    return gr.mount_gradio_app(app, demo, path="/")
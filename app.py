@@ -1,7 +1,7 @@
 import gradio as gr
 from utils import (
-    create_map,
-    get_nearby_shelters,
+    query_shelters,
+    get_district_from_location,
     process_location_json,
     get_filter_options,
     get_recommended_shelter,
@@ -12,21 +12,61 @@ from config import (
     UI_TEXT,
     DEFAULT_COORDINATES,
     FILTER_LABELS,
+    INSTRUMENTATION_CONFIG,
+    LANDMARKS,
+    NEARBY_CONFIG,
+    TELEMETRY_CONFIG,
+    WORKER_CONFIG,
 )
+from instrumentation import start_log_reporter
+from telemetry import TelemetryFileFeed, get_telemetry_store
+from workers import run_in_pool
 
 
 # 위치 정보 처리 함수 (Gradio update 반환용 래퍼)
-def process_location_json_for_gradio(location_json):
-    """utils의 process_location_json을 감싸서 Gradio update 객체 반환"""
-    latitude, longitude, detected_district, status_msg = process_location_json(
-        location_json
+async def process_location_json_for_gradio(
+    location_json, f_type, a_size, c_size, fan_filter, ac_filter, radius, limit
+):
+    """utils의 process_location_json을 감싸서 Gradio update 객체 반환
+
+    위치와 자치구를 바꾸면서 지도와 주변 쉼터 목록도 함께 한 번만 갱신한다.
+    """
+    latitude, longitude, detected_district, status_msg = await run_in_pool(
+        process_location_json, location_json
     )
 
     if latitude is None:
-        return gr.update(), gr.update(), gr.update(), status_msg
+        return (
+            gr.update(),
+            gr.update(),
+            gr.update(),
+            status_msg,
+            gr.update(),
+            gr.update(),
+        )
     else:
         # detected_district를 리스트로 변환 (멀티 선택을 위해)
-        return latitude, longitude, [detected_district], status_msg
+        map_result, nearby_result = await run_in_pool(
+            query_shelters,
+            latitude,
+            longitude,
+            f_type,
+            a_size,
+            c_size,
+            fan_filter,
+            ac_filter,
+            [detected_district],
+            radius_km=radius,
+            limit=int(limit),
+        )
+        return (
+            latitude,
+            longitude,
+            [detected_district],
+            status_msg,
+            map_result,
+            nearby_result,
+        )
 
 
 # Gradio 인터페이스 구성
@@ -155,19 +195,44 @@ def create_interface():
                         multiselect=True,
                     )
 
+                with gr.Row():
+                    radius_km = gr.Slider(
+                        minimum=NEARBY_CONFIG["radius_range"][0],
+                        maximum=NEARBY_CONFIG["radius_range"][1],
+                        step=0.5,
+                        value=NEARBY_CONFIG["radius_km"],
+                        label=FILTER_LABELS["radius_km"],
+                    )
+                    nearby_limit = gr.Slider(
+                        minimum=NEARBY_CONFIG["limit_range"][0],
+                        maximum=NEARBY_CONFIG["limit_range"][1],
+                        step=5,
+                        value=NEARBY_CONFIG["limit"],
+                        label=FILTER_LABELS["nearby_limit"],
+                    )
+
                 update_btn = gr.Button(
                     UI_TEXT["update_btn"], variant="primary", size="sm", visible=False
                 )
 
         # 이벤트 핸들러
-        def update_all(lat, lon, f_type, a_size, c_size, fan_filter, ac_filter, dist):
-            map_result = create_map(
-                lat, lon, f_type, a_size, c_size, fan_filter, ac_filter, dist
-            )
-            nearby_result = get_nearby_shelters(
-                lat, lon, f_type, a_size, c_size, fan_filter, ac_filter, dist
+        # 조회/렌더링은 workers의 공유 풀에서 실행 (이벤트 루프를 막지 않음)
+        async def update_all(
+            lat, lon, f_type, a_size, c_size, fan_filter, ac_filter, dist, radius, limit
+        ):
+            return await run_in_pool(
+                query_shelters,
+                lat,
+                lon,
+                f_type,
+                a_size,
+                c_size,
+                fan_filter,
+                ac_filter,
+                dist,
+                radius_km=radius,
+                limit=int(limit),
             )
-            return map_result, nearby_result
 
         # 위치 가져오기 버튼
         get_location_btn.click(
@@ -177,10 +242,30 @@ def create_interface():
         )
 
         # 위치 JSON이 업데이트되면 각 컴포넌트에 값 전달 (자치구 포함)
+        # 지도/주변 쉼터도 이 이벤트에서 함께 갱신하므로 별도 change 이벤트가 없다
         location_json_debug.change(
             fn=process_location_json_for_gradio,
-            inputs=[location_json_debug],
-            outputs=[user_lat, user_lon, district, location_status],  # district 추가
+            inputs=[
+                location_json_debug,
+                facility_type,
+                area_size,
+                capacity_size,
+                has_fan_filter,
+                has_ac_filter,
+                radius_km,
+                nearby_limit,
+            ],
+            outputs=[
+                user_lat,
+                user_lon,
+                district,
+                location_status,
+                map_html,
+                nearby_list,
+            ],
+            trigger_mode="always_last",
+            concurrency_limit=WORKER_CONFIG["render_concurrency_limit"],
+            concurrency_id="render",
         )
 
         # 지도 업데이트 버튼 이벤트
@@ -195,18 +280,24 @@ def create_interface():
                 has_fan_filter,
                 has_ac_filter,
                 district,
+                radius_km,
+                nearby_limit,
             ],
             outputs=[map_html, nearby_list],
+            concurrency_limit=WORKER_CONFIG["render_concurrency_limit"],
+            concurrency_id="render",
         )
 
         # 추천 버튼 이벤트 핸들러
-        def get_recommendation(lat, lon, is_elderly):
+        async def get_recommendation(lat, lon, is_elderly):
             # 65세 이상 여부에 따라 나이 설정
             user_age = 65 if is_elderly else 25  # 65세 이상이면 65, 아니면 25
             user_name = "사용자"  # 기본 이름
 
             recommendation_text, shelter_name, shelter_lat, shelter_lon = (
-                get_recommended_shelter(lat, lon, user_age, user_name)
+                await run_in_pool(
+                    get_recommended_shelter, lat, lon, user_age, user_name
+                )
             )
 
             if shelter_name and shelter_lat and shelter_lon:
@@ -231,26 +322,12 @@ def create_interface():
             fn=get_recommendation,
             inputs=[user_lat, user_lon, is_elderly],
             outputs=[recommendation_text, recommendation_directions_btn],
+            concurrency_limit=WORKER_CONFIG["recommend_concurrency_limit"],
         )
 
-        # 위치가 변경될 때 자동으로 지도 업데이트
-        for component in [user_lat, user_lon]:
-            component.change(
-                fn=update_all,
-                inputs=[
-                    user_lat,
-                    user_lon,
-                    facility_type,
-                    area_size,
-                    capacity_size,
-                    has_fan_filter,
-                    has_ac_filter,
-                    district,
-                ],
-                outputs=[map_html, nearby_list],
-            )
-
-        # 필터가 변경될 때 자동으로 지도 업데이트
+        # 사용자가 필터를 바꿀 때만 지도 업데이트
+        # (.input은 위치 처리 등에서 값을 설정할 때는 발생하지 않아 중복 렌더링을 막고,
+        #  always_last는 처리 중에 쌓인 연속 변경을 마지막 것 하나로 합친다)
         for filter_component in [
             facility_type,
             area_size,
@@ -258,8 +335,10 @@ def create_interface():
             has_fan_filter,
             has_ac_filter,
             district,
+            radius_km,
+            nearby_limit,
         ]:
-            filter_component.change(
+            filter_component.input(
                 fn=update_all,
                 inputs=[
                     user_lat,
@@ -270,8 +349,13 @@ def create_interface():
                     has_fan_filter,
                     has_ac_filter,
                     district,
+                    radius_km,
+                    nearby_limit,
                 ],
                 outputs=[map_html, nearby_list],
+                trigger_mode="always_last",
+                concurrency_limit=WORKER_CONFIG["render_concurrency_limit"],
+                concurrency_id="render",
             )
 
         # 수동 좌표 입력 아코디언
@@ -291,29 +375,11 @@ def create_interface():
             gr.Markdown("### 🏛️ 테스트용 랜드마크")
             gr.Markdown("아래 랜드마크를 클릭하면 해당 위치로 자동 설정됩니다.")
 
-            # 서울 주요 랜드마크들
-            landmarks = [
-                ("🏛️ 서울시청", 37.5665, 126.9780),
-                ("🗼 남산타워", 37.5512, 126.9882),
-                ("🏰 경복궁", 37.5796, 126.9770),
-                ("🏛️ 광화문", 37.5725, 126.9769),
-                ("🏢 강남역", 37.4980, 127.0276),
-                ("🏢 홍대입구역", 37.5572, 126.9254),
-                ("🏢 명동", 37.5636, 126.9834),
-                ("🏢 동대문", 37.5714, 127.0095),
-                ("🏢 잠실역", 37.5139, 127.1006),
-                ("🏢 강남구청", 37.5172, 127.0473),
-                ("🏢 서초구청", 37.4837, 127.0324),
-                ("🏢 마포구청", 37.5637, 126.9084),
-                ("🏢 종로구청", 37.5734, 126.9790),
-                ("🏢 중구청", 37.5638, 126.9974),
-            ]
-
             # 랜드마크 버튼들을 반반으로 나누어 배치
             with gr.Row():
                 with gr.Column(scale=1):
                     landmark_buttons_left = []
-                    for name, lat, lon in landmarks[:7]:  # 왼쪽 7개
+                    for name, lat, lon in LANDMARKS[:7]:  # 왼쪽 7개
                         btn = gr.Button(
                             name,
                             variant="outline",
@@ -324,7 +390,7 @@ def create_interface():
 
                 with gr.Column(scale=1):
                     landmark_buttons_right = []
-                    for name, lat, lon in landmarks[7:]:  # 오른쪽 7개
+                    for name, lat, lon in LANDMARKS[7:]:  # 오른쪽 7개
                         btn = gr.Button(
                             name,
                             variant="outline",
@@ -346,30 +412,21 @@ def create_interface():
                 return None, None
 
         # 수동 좌표 입력 시 지도와 주변 쉼터 업데이트
-        def set_manual_location_and_update(
-            lat, lon, f_type, a_size, c_size, fan_filter, ac_filter, dist
+        async def set_manual_location_and_update(
+            lat, lon, f_type, a_size, c_size, fan_filter, ac_filter, dist, radius, limit
         ):
             try:
                 lat = float(lat)
                 lon = float(lon)
 
                 # 새로운 위치의 자치구 감지
-                from utils import get_district_from_location
-
-                detected_district = get_district_from_location(lat, lon)
+                detected_district = await run_in_pool(
+                    get_district_from_location, lat, lon
+                )
 
                 # 지도와 주변 쉼터 업데이트
-                map_result = create_map(
-                    lat,
-                    lon,
-                    f_type,
-                    a_size,
-                    c_size,
-                    fan_filter,
-                    ac_filter,
-                    [detected_district],
-                )
-                nearby_result = get_nearby_shelters(
+                map_result, nearby_result = await run_in_pool(
+                    query_shelters,
                     lat,
                     lon,
                     f_type,
@@ -378,6 +435,8 @@ def create_interface():
                     fan_filter,
                     ac_filter,
                     [detected_district],
+                    radius_km=radius,
+                    limit=int(limit),
                 )
                 return lat, lon, map_result, nearby_result, [detected_district]
             except (ValueError, TypeError):
@@ -394,31 +453,25 @@ def create_interface():
                 has_fan_filter,
                 has_ac_filter,
                 district,
+                radius_km,
+                nearby_limit,
             ],
             outputs=[user_lat, user_lon, map_html, nearby_list, district],
+            trigger_mode="always_last",
+            concurrency_limit=WORKER_CONFIG["render_concurrency_limit"],
+            concurrency_id="render",
         )
 
         # 랜드마크 버튼 클릭 이벤트
-        def set_landmark_location(
-            lat, lon, f_type, a_size, c_size, fan_filter, ac_filter, dist
+        async def set_landmark_location(
+            lat, lon, f_type, a_size, c_size, fan_filter, ac_filter, dist, radius, limit
         ):
             # 새로운 위치의 자치구 감지
-            from utils import get_district_from_location
-
-            detected_district = get_district_from_location(lat, lon)
+            detected_district = await run_in_pool(get_district_from_location, lat, lon)
 
             # 지도와 주변 쉼터 업데이트
-            map_result = create_map(
-                lat,
-                lon,
-                f_type,
-                a_size,
-                c_size,
-                fan_filter,
-                ac_filter,
-                [detected_district],
-            )
-            nearby_result = get_nearby_shelters(
+            map_result, nearby_result = await run_in_pool(
+                query_shelters,
                 lat,
                 lon,
                 f_type,
@@ -427,6 +480,8 @@ def create_interface():
                 fan_filter,
                 ac_filter,
                 [detected_district],
+                radius_km=radius,
+                limit=int(limit),
             )
             return lat, lon, map_result, nearby_result, [detected_district]
 
@@ -443,8 +498,13 @@ def create_interface():
                     has_fan_filter,
                     has_ac_filter,
                     district,
+                    radius_km,
+                    nearby_limit,
                 ],
                 outputs=[user_lat, user_lon, map_html, nearby_list, district],
+                trigger_mode="always_last",
+                concurrency_limit=WORKER_CONFIG["render_concurrency_limit"],
+                concurrency_id="render",
             )
 
         # 초기 로드
@@ -459,10 +519,19 @@ def create_interface():
                 has_fan_filter,
                 has_ac_filter,
                 district,
+                radius_km,
+                nearby_limit,
             ],
             outputs=[map_html, nearby_list],
+            concurrency_limit=WORKER_CONFIG["render_concurrency_limit"],
+            concurrency_id="render",
         )
 
+    # 대기 요청 상한과 이벤트별 기본 동시 실행 수
+    demo.queue(
+        max_size=WORKER_CONFIG["queue_max_size"],
+        default_concurrency_limit=WORKER_CONFIG["default_concurrency_limit"],
+    )
     return demo
 
 
@@ -470,8 +539,36 @@ def create_interface():
 demo = create_interface()
 
 if __name__ == "__main__":
-    demo.launch(
-        share=APP_CONFIG["share"],
-        server_name=APP_CONFIG["server_name"],
-        server_port=APP_CONFIG["server_port"],
-    )
+    # 실시간 운영 정보 피드가 설정되어 있으면 백그라운드에서 계속 반영
+    if TELEMETRY_CONFIG["feed_path"]:
+        TelemetryFileFeed(
+            get_telemetry_store(),
+            TELEMETRY_CONFIG["feed_path"],
+            TELEMETRY_CONFIG["poll_interval"],
+        ).start()
+
+    # 계측이 켜져 있으면 단계별 평균 실행 시간을 주기적으로 로그에 남김
+    if INSTRUMENTATION_CONFIG["enabled"] and INSTRUMENTATION_CONFIG["log_interval"]:
+        import logging
+
+        logging.basicConfig(level=logging.INFO)
+        start_log_reporter()
+
+    if APP_CONFIG["share"]:
+        # 공유 링크는 Gradio 자체 서버에서만 지원하므로 JSON API 없이 실행
+        demo.launch(
+            share=True,
+            server_name=APP_CONFIG["server_name"],
+            server_port=APP_CONFIG["server_port"],
+        )
+    else:
+        import uvicorn
+
+        from api import create_app
+
+        # /api/... 는 JSON API, 나머지 경로는 Gradio UI
+        uvicorn.run(
+            create_app(demo),
+            host=APP_CONFIG["server_name"],
+            port=APP_CONFIG["server_port"],
+        )
@@ -0,0 +1,273 @@
+"""주요 조회 경로 벤치마크
+
+실제 쉼터 데이터를 복제/변형한 합성 데이터셋(행 수 지정)을 만들고, 테스트용
+랜드마크 주변의 고정된 무작위 위치로 utils의 각 함수를 호출해 지연시간
+백분위수와 메모리 사용량을 출력한다. 같은 --seed면 같은 데이터와 조회 위치를
+사용하므로 결과(--output JSON)를 커밋 간에 비교할 수 있다.
+
+    python benchmark.py
+    python benchmark.py --sizes real,10000,100000 --queries 500 --output bench.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import utils
+from config import LANDMARKS, NEARBY_CONFIG
+
+# 조회 위치는 랜드마크 주변 정규분포 (표준편차 약 1km)
+QUERY_JITTER_DEG = 0.01
+# 합성 쉼터 좌표는 원본 쉼터 주변 정규분포 (표준편차 약 300m)
+ROW_JITTER_DEG = 0.003
+
+
+def generate_dataset(n_rows, path, seed=0, source=utils.DATA_PATH):
+    """원본 CSV의 행을 무작위로 복제해 n_rows행 합성 CSV 생성
+
+    좌표는 원본 주변으로 흔들고, 쉼터명칭에 번호를 붙여 쉼터 ID가 겹치지 않게
+    하며, 실시간 온도/사용자 수는 새로 뽑는다.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(source)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+
+    for column in ("위도", "경도"):
+        values = pd.to_numeric(df[column], errors="coerce")
+        df[column] = (values + rng.normal(0, ROW_JITTER_DEG, n_rows)).round(7)
+    df["쉼터명칭"] = (
+        df["쉼터명칭"].astype(str) + "-" + pd.Series(range(n_rows)).astype(str)
+    )
+    df["current_temperature"] = rng.integers(22, 37, n_rows)
+    df["current_occupancy"] = rng.integers(0, 30, n_rows)
+
+    df.to_csv(path, index=False)
+    return path
+
+
+def query_points(n, seed=0):
+    """랜드마크 주변의 고정된 무작위 조회 위치 (위도 배열, 경도 배열)"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(LANDMARKS), n)
+    lats = np.array([LANDMARKS[i][1] for i in picks])
+    lons = np.array([LANDMARKS[i][2] for i in picks])
+    lats = lats + rng.normal(0, QUERY_JITTER_DEG, n)
+    lons = lons + rng.normal(0, QUERY_JITTER_DEG, n)
+    return lats.round(6).tolist(), lons.round(6).tolist()
+
+
+def random_filters(options, n, seed=0):
+    """필터 조합 n개 (필터마다 절반은 "전체", 나머지는 선택지 1~2개)"""
+    rng = np.random.default_rng(seed)
+    keys = (
+        "facility_types",
+        "area_sizes",
+        "capacity_sizes",
+        "fan_options",
+        "ac_options",
+        "districts",
+    )
+    combos = []
+    for _ in range(n):
+        combo = []
+        for key in keys:
+            choices = [value for value in options[key] if value != "전체"]
+            if rng.random() < 0.5 or not choices:
+                combo.append(["전체"])
+            else:
+                size = min(len(choices), int(rng.integers(1, 3)))
+                combo.append(rng.choice(choices, size, replace=False).tolist())
+        combos.append(tuple(combo))
+    return combos
+
+
+def _summarize(times):
+    ms = np.asarray(times) * 1000
+    return {
+        "n": len(ms),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def measure(fn, calls, setup=None):
+    """calls(인자 튜플 목록)마다 fn을 호출해 지연시간 요약과 최대 할당 메모리 반환
+
+    setup이 있으면 호출마다 먼저 실행하며 시간에서 제외한다. 메모리는
+    tracemalloc으로 첫 호출 한 번만 따로 측정한다 (시간 측정에는 영향 없음).
+    """
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn(*calls[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for args in calls:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+
+    result = _summarize(times)
+    result["peak_alloc_mb"] = peak / 2**20
+    return result
+
+
+def run_size(csv_path, queries, repeat, map_queries, seed):
+    """CSV 하나에 대해 모든 단계를 측정하고 {단계: 결과} 반환"""
+    results = {}
+    results["load_data"] = measure(utils.load_data, [(csv_path,)] * repeat)
+
+    raw = utils.load_data(csv_path)
+    copies = []
+    results["preprocess_data"] = measure(
+        lambda: utils.preprocess_data(copies.pop()),
+        [()] * repeat,
+        setup=lambda: copies.append(raw.copy()),
+    )
+
+    # 이후 단계는 이 CSV를 공유 데이터셋으로 사용
+    utils.DATA_PATH = csv_path
+    start = time.perf_counter()
+    dataset = utils.get_dataset()
+    results["get_dataset (first load)"] = _summarize([time.perf_counter() - start])
+
+    # 데이터셋이 붙잡고 있는 메모리 (스냅샷에서 다시 읽어 새 데이터셋으로 교체한 뒤
+    # 남은 할당량, 메모리 매핑된 스냅샷 컬럼은 제외)
+    dataset = None
+    gc.collect()
+    tracemalloc.start()
+    dataset = utils.reload_dataset(csv_path)
+    gc.collect()
+    dataset_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    lats, lons = query_points(queries, seed)
+    filters = random_filters(utils.get_filter_options(), queries, seed)
+    ages = np.random.default_rng(seed).choice([25, 70], queries).tolist()
+    points = list(zip(lats, lons))
+
+    # 조회 경로와 같이 공유 데이터셋의 필터 인덱스로 측정
+    results["filter_index.select"] = measure(
+        lambda *combo: dataset.filter_index.select(utils.filter_conditions(*combo)),
+        filters,
+    )
+    results["get_nearby_shelters"] = measure(
+        lambda lat, lon, combo: utils.get_nearby_shelters(
+            lat, lon, *combo, limit=NEARBY_CONFIG["limit"]
+        ),
+        [(lat, lon, combo) for (lat, lon), combo in zip(points, filters)],
+    )
+    results["get_recommended_shelter"] = measure(
+        utils.get_recommended_shelter,
+        [(lat, lon, age, "벤치마크") for (lat, lon), age in zip(points, ages)],
+    )
+    results["get_district_from_location"] = measure(
+        utils.get_district_from_location, points
+    )
+
+    map_calls = [
+        (lat, lon, *combo)
+        for (lat, lon), combo in zip(points[:map_queries], filters[:map_queries])
+    ]
+    results["create_map (cold)"] = measure(
+        utils.create_map, map_calls, setup=utils._shelter_layer_cache.clear
+    )
+    results["create_map (cached layer)"] = measure(utils.create_map, map_calls)
+
+    memory = {
+        "dataset_mb": dataset_mb,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    return len(dataset.store), results, memory
+
+
+def print_report(rows, results, memory):
+    print(
+        f"\n[{rows}행] 데이터셋 {memory['dataset_mb']:.1f}MB, "
+        f"최대 RSS {memory['max_rss_mb']:.0f}MB"
+    )
+    print(
+        f"{'단계':<28}{'n':>5}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+        f"{'alloc MB':>10}"
+    )
+    for stage, r in results.items():
+        print(
+            f"{stage:<28}{r['n']:>5}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+            f"{r.get('peak_alloc_mb', float('nan')):>10.1f}"
+        )
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description="쉼터 조회 경로 벤치마크 (시간 단위 ms)"
+    )
+    parser.add_argument(
+        "--sizes",
+        default="real,10000,100000",
+        help="쉼터 수 목록 (쉼표 구분, real은 원본 CSV)",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="단계별 조회 횟수")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="load_data/preprocess_data 반복 횟수"
+    )
+    parser.add_argument(
+        "--map-queries", type=int, default=20, help="create_map 호출 횟수"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args(argv[1:])
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "sizes": {},
+    }
+    original_path = utils.DATA_PATH
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            for size in args.sizes.split(","):
+                if size == "real":
+                    csv_path = original_path
+                else:
+                    csv_path = generate_dataset(
+                        int(size),
+                        os.path.join(workdir, f"shelters_{size}.csv"),
+                        args.seed,
+                        original_path,
+                    )
+                rows, results, memory = run_size(
+                    csv_path, args.queries, args.repeat, args.map_queries, args.seed
+                )
+                print_report(rows, results, memory)
+                report["sizes"][str(rows)] = {"stages": results, "memory": memory}
+        finally:
+            utils.DATA_PATH = original_path
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
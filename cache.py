@@ -0,0 +1,52 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """크기 상한(LRU)과 유효시간(TTL)이 있는 스레드 안전 캐시"""
+
+    def __init__(self, maxsize=128, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """키에 해당하는 값 반환 (없거나 만료되면 default)"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """값 저장 (상한을 넘으면 가장 오래 쓰이지 않은 항목부터 제거)"""
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """캐시에 없으면 factory()로 값을 만들어 저장한 뒤 반환"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_MISSING = object()
@@ -0,0 +1,104 @@
+from html import escape
+
+# 카드 목록 공통 스타일 (카드마다 인라인 스타일을 반복하지 않도록 한 번만 포함)
+CARD_STYLE = """<style>
+.shelter-list { max-height: 809px; overflow-y: auto; }
+.shelter-card { border: 3px solid #28a745; margin: 10px; padding: 15px; border-radius: 8px; background-color: #d4edda; box-shadow: 0 4px 8px rgba(0,0,0,0.1); }
+.shelter-card.closed { border-color: #dc3545; background-color: #f8d7da; }
+.shelter-card h3 { margin-top: 0; color: #2c3e50; }
+.shelter-card h4 { margin-top: 15px; margin-bottom: 10px; color: #e74c3c; font-size: 16px; }
+.shelter-status { background-color: #28a745; color: white; padding: 5px 10px; border-radius: 4px; margin-bottom: 10px; text-align: center; font-weight: bold; }
+.shelter-card.closed .shelter-status { background-color: #dc3545; }
+.shelter-route { margin-top: 10px; text-align: center; }
+.shelter-route a { display: inline-block; padding: 8px 16px; background-color: #FEE500; color: #3C1E1E; text-decoration: none; border-radius: 4px; font-weight: bold; font-size: 14px; }
+.shelter-page { margin: 10px; color: #6c757d; text-align: center; }
+</style>"""
+
+# 카드 한 장의 HTML (모듈 로드 시 한 번만 만들어 두고 값만 채움)
+_CARD_HTML = (
+    "<div class='shelter-card{closed}'>"
+    "<h3>{name}</h3>"
+    "<div class='shelter-status'>{status}</div>"
+    "<p><strong>거리:</strong> {distance}km</p>"
+    "<p><strong>시설구분:</strong> {type}</p>"
+    "<p><strong>주소:</strong> {address}</p>"
+    "<p><strong>면적:</strong> {area}</p>"
+    "<p><strong>수용인원:</strong> {capacity}</p>"
+    "<p><strong>편의시설:</strong> 선풍기 {fan}, 에어컨 {ac}</p>"
+    "<h4>실시간 운영 정보</h4>"
+    "<p><strong>현재 온도:</strong> {temperature}</p>"
+    "<p><strong>현재 사용자 수:</strong> {occupancy}</p>"
+    "<div class='shelter-route'>"
+    '<a href="{route_url}" target="_blank">🗺️ 카카오지도 길찾기</a>'
+    "</div>"
+    "</div>"
+).format
+
+_STATUS_OPEN = ("", "✅ 운영 중")
+_STATUS_CLOSED = (" closed", "🚫 미운영 중")
+
+
+def kakao_route_url(user_lat, user_lon, name, lat, lon):
+    """현재 위치에서 쉼터까지의 카카오지도 길찾기 링크"""
+    return f"https://map.kakao.com/link/from/현재위치,{user_lat},{user_lon}/to/{name},{lat},{lon}"
+
+
+# render_cards에 넘기는 컬럼 (카드 순서대로 정렬된 같은 길이의 시퀀스)
+CARD_FIELDS = (
+    "name",
+    "type",
+    "address",
+    "area",
+    "capacity",
+    "fan",
+    "ac",
+    "temperature",
+    "occupancy",
+    "operating",
+    "distance",
+    "lat",
+    "lon",
+)
+
+
+def render_cards(columns, user_lat, user_lon, total=None, offset=0, notice=None):
+    """주변 쉼터 카드 목록 HTML 생성
+
+    columns는 CARD_FIELDS의 각 이름에 표시할 값 시퀀스를 담은 dict이다.
+    total을 주면 전체 개수 중 몇 번째까지 보여주는지 목록 아래에 표시하고,
+    notice를 주면 목록 위에 안내 문구로 표시한다.
+    """
+    parts = [CARD_STYLE, "<div class='shelter-list'>"]
+    if notice:
+        parts.append(f"<div class='shelter-page'>{escape(notice)}</div>")
+    count = 0
+    for row in zip(*(columns[field] for field in CARD_FIELDS)):
+        name, type_, address, area, capacity, fan, ac, temperature, occupancy = row[:9]
+        operating, distance, lat, lon = row[9:]
+        closed, status = _STATUS_OPEN if operating else _STATUS_CLOSED
+        parts.append(
+            _CARD_HTML(
+                closed=closed,
+                name=escape(str(name)),
+                status=status,
+                distance=distance,
+                type=escape(str(type_)),
+                address=escape(str(address)),
+                area=escape(str(area)),
+                capacity=escape(str(capacity)),
+                fan=fan,
+                ac=ac,
+                temperature=temperature,
+                occupancy=occupancy,
+                route_url=escape(kakao_route_url(user_lat, user_lon, name, lat, lon)),
+            )
+        )
+        count += 1
+
+    if total is not None and 0 < count < total:
+        parts.append(
+            f"<div class='shelter-page'>전체 {total}곳 중 "
+            f"{offset + 1}-{offset + count}번째</div>"
+        )
+    parts.append("</div>")
+    return "".join(parts)
@@ -1,3 +1,5 @@
+import os
+
 # JavaScript 스크립트들
 GET_LOCATION_JS = """
 async () => {
@@ -65,16 +67,135 @@ UI_TEXT = {
     "location_section": "## 📍 내 위치 입력",
     "location_guide": "💡 **안내:** 현재 위치 가져오기를 하면 자치구 필터가 자동으로 설정됩니다!",
     "map_section": "## 🗺️ 쉼터 지도",
-    "nearby_section": "## 📋 주변 쉼터 목록 (1km 이내)",
+    "nearby_section": "## 📋 주변 쉼터 목록",
     "filter_section": "## 🔍 필터 설정",
     "get_location_btn": "📍 현재 위치 가져오기",
     "update_btn": "🔄 지도 업데이트",
     "location_status_default": "현재 위치 버튼을 클릭해주세요",
 }
 
+# 지도 설정
+MAP_CONFIG = {
+    # "cluster": GeoJSON 클러스터 레이어 하나로 표시 (팝업은 브라우저에서 생성)
+    # "markers": 쉼터마다 개별 마커와 팝업 HTML 생성
+    # "viewport": 보이는 영역의 쉼터만 싣고 지도를 움직이면 JSON API에서 다시 받음
+    #             (uvicorn으로 JSON API와 함께 실행할 때만 사용 가능)
+    "render_mode": "cluster",
+    "zoom_start": 12,
+    # 필터 조합별 쉼터 레이어 캐시 (최대 항목 수, 유효시간 초)
+    "layer_cache_size": 64,
+    "layer_cache_ttl": 600,
+    # viewport 모드: 쉼터 조회 API 경로, 처음 싣는 영역의 지도 크기 (가로, 세로 px)
+    "viewport_url": "/api/shelters/viewport",
+    "viewport_size": (1200, 800),
+    # 이 확대 수준 이상이고 영역 안 쉼터가 viewport_max_features개 이하이면 쉼터를
+    # 하나씩 보내고, 아니면 viewport_cell_px 크기 격자 칸별 쉼터 수로 묶어 보냄
+    "viewport_detail_zoom": 14,
+    "viewport_max_features": 2000,
+    "viewport_cell_px": 80,
+}
+
+# 주변 쉼터 검색 설정
+NEARBY_CONFIG = {
+    # 기본 검색 반경 (km)
+    "radius_km": 1.0,
+    # 반경 안에 쉼터가 없으면 반경을 두 배씩 넓혀 이 반경까지 검색
+    "max_radius_km": 8.0,
+    # 카드로 보여줄 최대 쉼터 수
+    "limit": 20,
+    # 화면 슬라이더 범위
+    "radius_range": (0.5, 5.0),
+    "limit_range": (5, 100),
+}
+
+# 여러 위치 일괄 조회 설정
+BATCH_CONFIG = {
+    # 한 번에 거리 행렬을 계산할 위치 수 (메모리 사용량: 위치 수 x 쉼터 수 x 8바이트)
+    "chunk_size": 1000,
+    # 거리 행렬 칸 수 상한 (쉼터가 많으면 위치 수를 줄임, 400만 칸은 약 32MB)
+    "max_matrix_cells": 4_000_000,
+    # 2 이상이면 조각들을 여러 프로세스에서 나눠 계산
+    "workers": 1,
+    # API 요청 한 번에 받을 수 있는 최대 위치 수
+    "max_points": 100000,
+}
+
+# 요청 처리 설정
+WORKER_CONFIG = {
+    # 조회/렌더링을 실행할 풀 ("thread" 또는 "process")
+    # process는 코어 수만큼 확장되지만 작업자마다 데이터셋을 따로 읽고,
+    # 실시간 측정값은 피드 파일로 들어온 값만 반영된다 (HTTP 입력은 반영 안 됨)
+    "pool": "thread",
+    "max_workers": min(8, os.cpu_count() or 1),
+    # Gradio 큐 (대기 요청 상한, 이벤트별 기본 동시 실행 수)
+    "queue_max_size": 256,
+    "default_concurrency_limit": 4,
+    # 지도/목록 갱신 이벤트 전체가 함께 쓰는 동시 실행 수
+    "render_concurrency_limit": 8,
+    # 맞춤 추천 이벤트 동시 실행 수
+    "recommend_concurrency_limit": 16,
+}
+
+# 단계별 실행 시간 계측 (켜면 /metrics에서 Prometheus 형식으로 조회)
+INSTRUMENTATION_CONFIG = {
+    "enabled": os.environ.get("SHELTER_INSTRUMENTATION") == "1",
+    # 0보다 크면 이 주기(초)마다 단계별 평균 시간을 로그로 남김
+    "log_interval": 0,
+}
+
+# 주변 쉼터/추천 결과 캐시 (같은 geohash 칸에서 반복되는 조회 재사용)
+RESULT_CACHE_CONFIG = {
+    "enabled": True,
+    # geohash 자릿수 (7자리는 약 150m x 150m 칸, 6자리는 약 1.2km x 0.6km 칸)
+    "geohash_precision": 7,
+    # 최대 항목 수, 유효시간 (초)
+    "maxsize": 4096,
+    "ttl": 300,
+}
+
+# 실시간 운영 정보(온도/사용자 수) 피드 설정
+TELEMETRY_CONFIG = {
+    # 측정값이 한 줄에 하나씩 JSON으로 추가되는 파일 (없으면 CSV 값만 사용)
+    # 예: {"shelter_id": "1120054000:정화경로당", "current_temperature": 28,
+    #      "current_occupancy": 5, "timestamp": 1754000000}
+    "feed_path": os.environ.get("SHELTER_TELEMETRY_FEED"),
+    # 피드 파일 확인 주기 (초)
+    "poll_interval": 5,
+    # POST /api/telemetry 인증 토큰 (X-Telemetry-Token 헤더, 없으면 API로 받지 않음)
+    "api_token": os.environ.get("SHELTER_TELEMETRY_TOKEN"),
+}
+
+# 자치구 경계 설정
+DISTRICT_CONFIG = {
+    # 자치구 행정경계 GeoJSON (Polygon/MultiPolygon, properties.name에 자치구 이름)
+    # 예: 통계청(KOSTAT) 시군구 경계에서 서울 자치구만 뽑은 파일
+    # 파일이 없으면 가까운 쉼터들의 자치구 다수결로 추정한다
+    "boundary_path": os.environ.get(
+        "SHELTER_DISTRICT_BOUNDARIES", "seoul_districts.geojson"
+    ),
+}
+
 # 기본 좌표 (서울시청)
 DEFAULT_COORDINATES = {"latitude": 37.5665, "longitude": 126.9780}
 
+# 서울 주요 랜드마크 (테스트용 위치 버튼, 벤치마크 조회 위치)
+LANDMARKS = [
+    ("🏛️ 서울시청", 37.5665, 126.9780),
+    ("🗼 남산타워", 37.5512, 126.9882),
+    ("🏰 경복궁", 37.5796, 126.9770),
+    ("🏛️ 광화문", 37.5725, 126.9769),
+    ("🏢 강남역", 37.4980, 127.0276),
+    ("🏢 홍대입구역", 37.5572, 126.9254),
+    ("🏢 명동", 37.5636, 126.9834),
+    ("🏢 동대문", 37.5714, 127.0095),
+    ("🏢 잠실역", 37.5139, 127.1006),
+    ("🏢 강남구청", 37.5172, 127.0473),
+    ("🏢 서초구청", 37.4837, 127.0324),
+    ("🏢 마포구청", 37.5637, 126.9084),
+    ("🏢 종로구청", 37.5734, 126.9790),
+    ("🏢 중구청", 37.5638, 126.9974),
+]
+
 # 필터 라벨
 FILTER_LABELS = {
     "facility_type": "시설구분",
@@ -83,4 +204,6 @@ FILTER_LABELS = {
     "fan_filter": "선풍기",
     "ac_filter": "에어컨",
     "district": "자치구 (📍 위치 기반 자동 설정)",
+    "radius_km": "검색 반경 (km)",
+    "nearby_limit": "표시할 쉼터 수",
 }
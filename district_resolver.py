@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+from collections import defaultdict
+
+import numpy as np
+
+from config import DISTRICT_CONFIG
+
+logger = logging.getLogger("shelter.district")
+
+# 자치구 경계 GeoJSON (상대 경로는 이 모듈 위치 기준)
+BOUNDARY_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), DISTRICT_CONFIG["boundary_path"]
+)
+
+
+def _point_in_rings(lat, lon, rings):
+    """짝-홀 규칙으로 점이 링들(외곽+구멍)로 둘러싸인 영역 안에 있는지 확인"""
+    inside = False
+    for ring in rings:
+        lons, lats = ring[:, 0], ring[:, 1]
+        next_lons, next_lats = np.roll(lons, -1), np.roll(lats, -1)
+        crosses = (lats > lat) != (next_lats > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = lons + (lat - lats) * (next_lons - lons) / (next_lats - lats)
+        inside ^= bool(np.count_nonzero(crosses & (lon < x)) % 2)
+    return inside
+
+
+class DistrictResolver:
+    """자치구 경계 폴리곤 기반 위치 → 자치구 변환기
+
+    폴리곤마다 경계 상자(bbox)를 구해 두고, 지역을 grid_deg 크기 격자로 나눠
+    칸마다 겹치는 폴리곤 목록을 미리 계산한다. 조회 시에는 점이 속한 칸의
+    후보 폴리곤만 bbox와 짝-홀 규칙으로 검사한다.
+    """
+
+    def __init__(self, polygons, grid_deg=0.01):
+        # polygons: [(자치구 이름, [링 배열(경도, 위도) ...]), ...]
+        self.grid_deg = grid_deg
+        self._names = [name for name, _ in polygons]
+        self._rings = [rings for _, rings in polygons]
+        self._bboxes = np.array(
+            [
+                [
+                    min(ring[:, 1].min() for ring in rings),
+                    min(ring[:, 0].min() for ring in rings),
+                    max(ring[:, 1].max() for ring in rings),
+                    max(ring[:, 0].max() for ring in rings),
+                ]
+                for rings in self._rings
+            ]
+        ).reshape(-1, 4)
+
+        self._grid = defaultdict(list)
+        for i, (min_lat, min_lon, max_lat, max_lon) in enumerate(self._bboxes):
+            for row in range(self._cell(min_lat), self._cell(max_lat) + 1):
+                for col in range(self._cell(min_lon), self._cell(max_lon) + 1):
+                    self._grid[(row, col)].append(i)
+
+    @classmethod
+    def from_geojson(cls, path=BOUNDARY_PATH, **kwargs):
+        """GeoJSON FeatureCollection(Polygon/MultiPolygon)에서 생성"""
+        with open(path, encoding="utf-8") as f:
+            collection = json.load(f)
+
+        polygons = []
+        for feature in collection["features"]:
+            geometry = feature["geometry"]
+            if geometry["type"] == "Polygon":
+                parts = [geometry["coordinates"]]
+            else:
+                parts = geometry["coordinates"]
+            rings = [
+                np.asarray(ring, dtype="float64") for part in parts for ring in part
+            ]
+            polygons.append((feature["properties"]["name"], rings))
+        return cls(polygons, **kwargs)
+
+    def _cell(self, value):
+        return int(np.floor(value / self.grid_deg))
+
+    def resolve(self, lat, lon):
+        """위치가 속한 자치구 이름 반환 (어느 경계에도 속하지 않으면 None)"""
+        for i in self._grid.get((self._cell(lat), self._cell(lon)), ()):
+            min_lat, min_lon, max_lat, max_lon = self._bboxes[i]
+            if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                continue
+            if _point_in_rings(lat, lon, self._rings[i]):
+                return self._names[i]
+        return None
+
+
+_resolver = None
+_missing_logged = False
+
+
+def get_district_resolver():
+    """경계 파일로 만든 공유 DistrictResolver 반환 (파일이 없으면 None)"""
+    global _resolver, _missing_logged
+    if _resolver is None:
+        if os.path.exists(BOUNDARY_PATH):
+            _resolver = DistrictResolver.from_geojson(BOUNDARY_PATH)
+        elif not _missing_logged:
+            # 경계 파일 없이도 동작하지만 경계 부근에서 틀릴 수 있으므로 한 번 알린다
+            _missing_logged = True
+            logger.warning(
+                "자치구 경계 파일이 없어 가까운 쉼터들로 자치구를 추정합니다: %s",
+                BOUNDARY_PATH,
+            )
+    return _resolver
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+# 필터 대상 컬럼 (filter_data 인자 순서와 동일)
+FILTER_COLUMNS = (
+    "시설구분2",
+    "시설면적_분류",
+    "이용가능인원_분류",
+    "선풍기_여부",
+    "에어컨_여부",
+    "자치구",
+)
+
+# 해당 필터를 적용하지 않음을 뜻하는 선택값
+ALL_VALUE = "전체"
+
+
+def _readonly(array):
+    # 여러 스레드가 동시에 읽으므로 만든 뒤에는 쓰기 금지
+    array.flags.writeable = False
+    return array
+
+
+class FilterIndex:
+    """필터 컬럼별 값 비트맵 인덱스
+
+    각 컬럼을 범주형 정수 코드로 바꾸고, 값마다 해당 행의 비트를 켠 비트맵
+    (np.packbits로 압축한 uint8 배열)을 미리 만들어 둔다. 필터 조합은 같은
+    컬럼 안에서는 OR, 컬럼 간에는 AND로 비트맵을 합쳐 계산하므로 요청마다
+    DataFrame을 복사하지 않는다.
+    """
+
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        self.size = len(df)
+        self.categories = {}
+        self._bitmaps = {}
+        self._all = _readonly(np.packbits(np.ones(self.size, dtype=bool)))
+
+        for column in columns:
+            categorical = pd.Categorical(df[column])
+            codes = categorical.codes
+            self.categories[column] = list(categorical.categories)
+            self._bitmaps[column] = {
+                value: _readonly(np.packbits(codes == code))
+                for code, value in enumerate(categorical.categories)
+            }
+
+    def bitmap(self, conditions):
+        """조건({컬럼: 선택값 리스트})을 만족하는 행의 압축 비트맵 반환"""
+        result = self._all.copy()
+        for column, values in conditions.items():
+            if not values or ALL_VALUE in values:
+                continue
+
+            selected = np.zeros_like(result)
+            bitmaps = self._bitmaps[column]
+            for value in values:
+                if value in bitmaps:
+                    np.bitwise_or(selected, bitmaps[value], out=selected)
+            np.bitwise_and(result, selected, out=result)
+        return result
+
+    def mask(self, conditions):
+        """조건을 만족하는 행의 불리언 배열 반환"""
+        return np.unpackbits(self.bitmap(conditions), count=self.size).astype(bool)
+
+    def select(self, conditions):
+        """조건을 만족하는 행의 정수 위치(iloc) 배열 반환"""
+        return np.flatnonzero(np.unpackbits(self.bitmap(conditions), count=self.size))
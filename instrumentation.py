@@ -0,0 +1,196 @@
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+import logging
+import threading
+import time
+
+from config import INSTRUMENTATION_CONFIG
+
+logger = logging.getLogger("shelter.metrics")
+
+# 히스토그램 구간 상한 (Prometheus의 le 값)
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+BYTES_BUCKETS = (1 << 10, 10 << 10, 100 << 10, 1 << 20, 10 << 20, 100 << 20)
+
+_enabled = INSTRUMENTATION_CONFIG["enabled"]
+
+
+class Histogram:
+    """누적 구간 개수/합계/개수를 보관하는 스레드 안전 히스토그램"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self):
+        """(구간 상한별 누적 개수, 합계, 개수) 반환"""
+        with self._lock:
+            counts, total, count = list(self.counts), self.total, self.count
+        cumulative, running = [], 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            running += n
+            cumulative.append((bound, running))
+        return cumulative, total, count
+
+
+# (지표 이름, 단계 이름) → Histogram
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+_METRICS = {
+    "shelter_stage_seconds": ("단계별 실행 시간(초)", SECONDS_BUCKETS),
+    "shelter_stage_rows": ("단계별 처리 행 수", ROWS_BUCKETS),
+    "shelter_stage_output_bytes": ("단계별 출력 크기(바이트)", BYTES_BUCKETS),
+}
+
+
+def _histogram(metric, name):
+    key = (metric, name)
+    histogram = _metrics.get(key)
+    if histogram is None:
+        with _metrics_lock:
+            histogram = _metrics.setdefault(key, Histogram(_METRICS[metric][1]))
+    return histogram
+
+
+def enable(enabled=True):
+    """계측 켜기/끄기 (꺼져 있으면 stage/record 호출은 아무것도 하지 않음)"""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _histogram("shelter_stage_seconds", self.name).observe(elapsed)
+        return False
+
+
+_NOOP = nullcontext()
+
+
+def stage(name):
+    """with 블록의 실행 시간을 name 단계로 기록하는 컨텍스트 매니저"""
+    return _Stage(name) if _enabled else _NOOP
+
+
+def timed(name):
+    """함수 실행 시간을 name 단계로 기록하는 데코레이터"""
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_rows(name, rows):
+    """name 단계에서 처리한 행 수 기록"""
+    if _enabled:
+        _histogram("shelter_stage_rows", name).observe(rows)
+
+
+def record_bytes(name, text):
+    """name 단계 출력 문자열의 UTF-8 바이트 수 기록 (문자열을 그대로 반환)"""
+    if _enabled and isinstance(text, str):
+        _histogram("shelter_stage_output_bytes", name).observe(
+            len(text.encode("utf-8"))
+        )
+    return text
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+def render_prometheus():
+    """모든 히스토그램을 Prometheus 텍스트 형식으로 반환"""
+    with _metrics_lock:
+        items = sorted(_metrics.items())
+
+    lines = []
+    for metric, (help_text, _) in _METRICS.items():
+        histograms = [(name, h) for (m, name), h in items if m == metric]
+        if not histograms:
+            continue
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, histogram in histograms:
+            cumulative, total, count = histogram.snapshot()
+            for bound, n in cumulative:
+                lines.append(
+                    f'{metric}_bucket{{stage="{name}",le="{_format_value(bound)}"}} {n}'
+                )
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total:g}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def summary_line():
+    """단계별 호출 수와 평균 시간(ms) 한 줄 요약"""
+    with _metrics_lock:
+        items = sorted(_metrics.items())
+    parts = []
+    for (metric, name), histogram in items:
+        if metric != "shelter_stage_seconds":
+            continue
+        _, total, count = histogram.snapshot()
+        if count:
+            parts.append(f"{name}={count}회/{total / count * 1000:.1f}ms")
+    return " ".join(parts)
+
+
+def start_log_reporter(interval=None):
+    """interval초마다 summary_line()을 로그로 남기는 백그라운드 스레드 시작"""
+    interval = interval or INSTRUMENTATION_CONFIG["log_interval"]
+    if not interval:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            line = summary_line()
+            if line:
+                logger.info("stage timings: %s", line)
+
+    thread = threading.Thread(target=run, name="metrics-log", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,154 @@
+from html import escape
+import json
+
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+# 두 레이어가 함께 쓰는 팝업/마커 스크립트 (feature properties로 팝업 생성)
+_POPUP_SCRIPT = """
+                function esc(value) {
+                    if (value === null || value === undefined) { return "정보없음"; }
+                    return String(value).replace(/[&<>"']/g, function(c) {
+                        return {"&": "&amp;", "<": "&lt;", ">": "&gt;",
+                                '"': "&quot;", "'": "&#39;"}[c];
+                    });
+                }
+                function popup(p) {
+                    return "<b>" + esc(p.name) + "</b><br>"
+                        + "시설구분: " + esc(p.type) + "<br>"
+                        + "주소: " + esc(p.address) + "<br>"
+                        + "면적: " + esc(p.area) + "<br>"
+                        + "수용인원: " + esc(p.capacity) + "<br>"
+                        + "선풍기: " + esc(p.fan) + "<br>"
+                        + "에어컨: " + esc(p.ac) + "<br>"
+                        + "야간운영: " + esc(p.night) + "<br>"
+                        + "휴일운영: " + esc(p.holiday) + "<br>"
+                        + "숙박가능: " + esc(p.stay);
+                }
+
+                var icon = L.AwesomeMarkers.icon(
+                    {icon: "home", markerColor: "blue", iconColor: "white", prefix: "glyphicon"}
+                );
+                function shelterMarker(feature, latlng) {
+                    var p = feature.properties;
+                    return L.marker(latlng, {icon: icon})
+                        .bindTooltip(esc(p.name))
+                        .bindPopup(function() { return popup(p); }, {maxWidth: 300});
+                }
+"""
+
+
+class ShelterClusterLayer(MarkerCluster):
+    """쉼터 전체를 GeoJSON 하나로 싣고 마커/팝업은 브라우저에서 만드는 클러스터 레이어
+
+    쉼터마다 folium.Marker와 팝업 HTML을 만드는 대신, 미리 직렬화한 GeoJSON
+    문자열을 그대로 스크립트에 넣고 팝업 내용은 feature properties로 그린다.
+
+    folium은 렌더링된 스크립트를 다시 템플릿으로 컴파일하므로, 큰 GeoJSON은
+    자리표시자로 렌더링한 뒤 fill()로 최종 HTML에 끼워 넣는다.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){"""
+        + _POPUP_SCRIPT
+        + """
+                var cluster = L.markerClusterGroup({chunkedLoading: true});
+                L.geoJSON({{ this.placeholder }}, {
+                    pointToLayer: shelterMarker
+                }).addTo(cluster);
+
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, geojson, name=None):
+        super().__init__(name=name)
+        self._name = "ShelterClusterLayer"
+        # <script> 안에 그대로 들어가므로 "</script>"가 생기지 않도록 처리
+        self.geojson = geojson.replace("</", "<\\/")
+        self.placeholder = f"__{self.get_name()}_geojson__"
+
+    def fill(self, map_html):
+        """지도의 _repr_html_() 결과에서 자리표시자를 GeoJSON으로 치환"""
+        # _repr_html_()은 문서 전체를 escape해 iframe srcdoc에 넣으므로 같은 방식으로 처리
+        return map_html.replace(self.placeholder, escape(self.geojson), 1)
+
+
+class ShelterViewportLayer(ShelterClusterLayer):
+    """보이는 영역의 쉼터만 싣고, 지도를 움직이면 서버에서 다시 받아오는 레이어
+
+    처음에는 초기 화면 영역의 GeoJSON만 넣고, moveend마다 url에 현재 경계
+    상자(south/west/north/east)와 확대 수준(zoom), 필터(query)를 붙여 요청한
+    GeoJSON으로 바꾼다. properties에 count가 있는 feature는 격자 칸별로 묶은
+    쉼터 수로 표시하고, 누르면 그 위치로 확대한다. 요청이 실패하면 기존
+    표시를 유지한다.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){"""
+        + _POPUP_SCRIPT
+        + """
+                var map = {{ this._parent.get_name() }};
+                var cluster = L.markerClusterGroup({chunkedLoading: true});
+
+                function cellMarker(feature, latlng) {
+                    var count = feature.properties.count;
+                    var size = count < 10 ? "small" : (count < 100 ? "medium" : "large");
+                    return L.marker(latlng, {icon: L.divIcon({
+                        html: "<div><span>" + count + "</span></div>",
+                        className: "marker-cluster marker-cluster-" + size,
+                        iconSize: L.point(40, 40)
+                    })}).on("click", function() {
+                        map.setView(latlng, map.getZoom() + 2);
+                    });
+                }
+                function render(data) {
+                    cluster.clearLayers();
+                    L.geoJSON(data, {
+                        pointToLayer: function(feature, latlng) {
+                            return feature.properties.count === undefined
+                                ? shelterMarker(feature, latlng)
+                                : cellMarker(feature, latlng);
+                        }
+                    }).addTo(cluster);
+                }
+
+                // 늦게 도착한 이전 요청의 응답은 버린다
+                var latest = 0;
+                function refresh() {
+                    var bounds = map.getBounds();
+                    var request = ++latest;
+                    var url = {{ this.url_json }} + "?" + {{ this.query_json }}
+                        + "&south=" + bounds.getSouth() + "&west=" + bounds.getWest()
+                        + "&north=" + bounds.getNorth() + "&east=" + bounds.getEast()
+                        + "&zoom=" + map.getZoom();
+                    fetch(url)
+                        .then(function(response) { return response.ok ? response.json() : null; })
+                        .then(function(data) { if (data && request === latest) { render(data); } })
+                        .catch(function() {});
+                }
+
+                render({{ this.placeholder }});
+                cluster.addTo(map);
+                map.on("moveend", refresh);
+                refresh();
+                return cluster;
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, geojson, url, query="", name=None):
+        super().__init__(geojson, name=name)
+        self._name = "ShelterViewportLayer"
+        self.placeholder = f"__{self.get_name()}_geojson__"
+        # 스크립트 안 문자열 리터럴로 넣음
+        self.url_json = json.dumps(url).replace("</", "<\\/")
+        self.query_json = json.dumps(query).replace("</", "<\\/")
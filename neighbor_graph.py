@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+from spatial_index import haversine_array
+
+# 쉼터마다 미리 계산해 두는 가까운 이웃 수
+DEFAULT_NEIGHBORS = 16
+
+# 부동소수점 오차로 경계에서 잘못 보장하지 않도록 두는 여유 (km)
+_MARGIN_KM = 1e-6
+
+DISTRICT_COLUMNS = ("count", "lat", "lon")
+
+
+class NeighborGraph:
+    """쉼터별 가까운 이웃 목록(거리순) 그래프
+
+    사용자에게 가장 가까운 쉼터(seed)의 이웃 목록만 보고 답을 구한 뒤,
+    seed까지 거리 + 답의 최대 거리가 seed 이웃 목록이 덮는 반경보다 작으면
+    (삼각 부등식) 전체를 검색한 것과 같은 결과임이 보장된다.
+    """
+
+    def __init__(self, lats, lons, neighbors, distances):
+        self._lats = np.asarray(lats, dtype="float64")
+        self._lons = np.asarray(lons, dtype="float64")
+        self.neighbors = neighbors
+        self.distances = distances
+        # 이웃 목록이 덮는 반경 (목록이 다 차지 않았으면 빈 칸이 inf라 무한대)
+        self.coverage_km = distances[:, -1] if distances.shape[1] else None
+
+    def __len__(self):
+        return len(self.neighbors)
+
+    def nearest(self, lat, lon, k, seed, seed_distance, mask=None):
+        """seed의 이웃 목록만으로 가까운 k개 쉼터의 (위치, 거리) 반환
+
+        mask를 주면 mask가 True인 쉼터만 고른다. 이웃 목록 범위로 결과를
+        보장할 수 없으면 None을 반환하므로 호출 측에서 전체 검색으로 대신한다.
+        """
+        if self.coverage_km is None:
+            return None
+        positions = self.neighbors[seed]
+        positions = np.append(positions[positions >= 0], seed)
+        if mask is not None:
+            positions = positions[mask[positions]]
+        distances = haversine_array(
+            lon, lat, self._lons[positions], self._lats[positions]
+        )
+        order = np.lexsort((positions, distances))[:k]
+        positions, distances = positions[order], distances[order]
+
+        coverage_km = self.coverage_km[seed]
+        if np.isfinite(coverage_km):
+            reach_km = distances[-1] if len(positions) == k and k > 0 else np.inf
+            if seed_distance + reach_km + _MARGIN_KM >= coverage_km:
+                return None
+        return positions, distances
+
+    def to_arrays(self):
+        return {"neighbors": self.neighbors, "neighbor_distances": self.distances}
+
+    @classmethod
+    def from_arrays(cls, lats, lons, arrays):
+        return cls(lats, lons, arrays["neighbors"], arrays["neighbor_distances"])
+
+
+def build_neighbor_graph(spatial_index, lats, lons, k=DEFAULT_NEIGHBORS):
+    """공간 인덱스로 쉼터별 가까운 k개 이웃 그래프 생성"""
+    neighbors, distances = spatial_index.knn_table(k)
+    for array in (neighbors, distances):
+        array.flags.writeable = False
+    return NeighborGraph(lats, lons, neighbors, distances)
+
+
+def update_neighbor_graph(graph, kept, spatial_index, lats, lons, k=DEFAULT_NEIGHBORS):
+    """이전 그래프를 재사용해 바뀐 쉼터 주변 행만 다시 계산한 이웃 그래프 생성
+
+    kept는 (이전 위치 배열, 새 위치 배열)로 좌표가 그대로인 쉼터의 대응이다.
+    이웃 목록은 거리순 k개이므로, 유지된 쉼터의 목록은 이웃 중 빠진(삭제/이동)
+    쉼터가 없고 새로 들어온(추가/이동) 쉼터가 목록 반경(k번째 거리)보다 멀면
+    그대로 유효하다. 그 밖의 행만 spatial_index.knn_table로 다시 계산한다.
+    """
+    kept_old, kept_new = kept
+    n = len(lats)
+    fresh = np.ones(n, dtype=bool)
+    fresh[kept_new] = False
+    fresh = np.flatnonzero(fresh & ~(np.isnan(lats) | np.isnan(lons)))
+    # 거리가 같은 이웃은 위치가 작은 쪽이 먼저이므로, 유지된 쉼터끼리 순서가
+    # 바뀌었으면 (CSV 행 순서 변경) 동점 처리가 달라질 수 있어 처음부터 만든다
+    reordered = np.any(np.diff(kept_old[np.argsort(kept_new)]) < 0)
+    if graph.neighbors.shape[1] != k or len(fresh) * 4 > n or reordered:
+        return build_neighbor_graph(spatial_index, lats, lons, k)
+
+    # 이전 위치 → 새 위치 (빠진 쉼터는 -1)
+    old_to_new = np.full(len(graph) + 1, -1, dtype="int64")
+    old_to_new[kept_old] = kept_new
+    old_neighbors = graph.neighbors[kept_old]
+    mapped = old_to_new[old_neighbors]  # 빈 칸(-1)은 마지막 칸(-1)을 가리킨다
+
+    neighbors = np.full((n, k), -1, dtype="int64")
+    distances = np.full((n, k), np.inf)
+    neighbors[kept_new] = mapped
+    distances[kept_new] = graph.distances[kept_old]
+
+    stale = np.zeros(n, dtype=bool)
+    stale[fresh] = True
+    stale[kept_new[((old_neighbors >= 0) & (mapped < 0)).any(axis=1)]] = True
+
+    coverage = distances[:, -1]
+    finite = np.isfinite(coverage)
+    stale[kept_new[~finite[kept_new]]] = True
+    if len(fresh) and finite.any():
+        reach = coverage[finite].max()
+        for position in fresh:
+            near, near_distances = spatial_index.query_radius(
+                lats[position], lons[position], reach
+            )
+            stale[near[near_distances <= coverage[near]]] = True
+
+    # 위치 번호가 바뀌었으므로 거리가 같은 이웃의 순서를 다시 맞춘다
+    order = np.lexsort((neighbors, distances), axis=-1)
+    neighbors = np.take_along_axis(neighbors, order, axis=1)
+    distances = np.take_along_axis(distances, order, axis=1)
+
+    rows = np.flatnonzero(stale)
+    if len(rows):
+        fresh_neighbors, fresh_distances = spatial_index.knn_table(k, rows)
+        neighbors[rows] = fresh_neighbors[rows]
+        distances[rows] = fresh_distances[rows]
+
+    for array in (neighbors, distances):
+        array.flags.writeable = False
+    return NeighborGraph(lats, lons, neighbors, distances)
+
+
+def district_summary(df):
+    """자치구별 쉼터 수와 중심 좌표(평균) DataFrame (자치구 이름 인덱스)"""
+    lats = pd.to_numeric(df["위도"], errors="coerce")
+    lons = pd.to_numeric(df["경도"], errors="coerce")
+    located = pd.DataFrame({"자치구": df["자치구"], "lat": lats, "lon": lons})
+    located = located[
+        located["lat"].notna() & located["lon"].notna() & (located["자치구"] != "기타")
+    ]
+    grouped = located.groupby("자치구", sort=True)
+    summary = pd.DataFrame(
+        {
+            "count": grouped.size(),
+            "lat": grouped["lat"].mean(),
+            "lon": grouped["lon"].mean(),
+        }
+    )
+    return summary.astype("float64")[list(DISTRICT_COLUMNS)]
+
+
+def district_summary_to_arrays(summary):
+    return {
+        "district_names": summary.index.to_numpy(dtype=str),
+        "district_stats": summary.to_numpy(dtype="float64"),
+    }
+
+
+def district_summary_from_arrays(arrays):
+    return pd.DataFrame(
+        arrays["district_stats"],
+        index=pd.Index(arrays["district_names"].tolist(), name="자치구"),
+        columns=list(DISTRICT_COLUMNS),
+    )
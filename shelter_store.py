@@ -0,0 +1,130 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# 숫자 필드 → 원본 컬럼 (float64 배열, 결측값은 NaN)
+NUMERIC_FIELDS = {
+    "lat": "위도",
+    "lon": "경도",
+    "area": "시설면적",
+    "capacity": "이용가능인원",
+    "temperature": "current_temperature",
+    "occupancy": "current_occupancy",
+}
+
+# 원본이 정수 컬럼이라 소수점 없이 표시하는 숫자 필드
+INTEGER_FIELDS = ("capacity",)
+
+# 문자열 필드 → 원본 컬럼 (중복 값은 문자열 표 하나에 모으고 행마다 코드만 저장)
+TEXT_FIELDS = {
+    "name": "쉼터명칭",
+    "type": "시설구분2",
+    "address": "도로명주소",
+    "district": "자치구",
+    "area_class": "시설면적_분류",
+    "capacity_class": "이용가능인원_분류",
+    "fan": "선풍기_여부",
+    "ac": "에어컨_여부",
+    "night": "야간운영여부",
+    "holiday": "휴일운영여부",
+    "stay": "숙박가능여부",
+}
+
+
+class ShelterStore:
+    """조회용 쉼터 필드를 컬럼별 배열로 담은 읽기 전용 저장소
+
+    숫자 필드는 float64 배열로, 문자열 필드는 int32 코드 배열과 중복 없는
+    문자열 표로 보관한다. 원본 컬럼이 이미 float64면 (스냅샷의 메모리 매핑
+    배열 등) 복사하지 않고 그 배열을 그대로 쓴다. 행 하나를 pandas Series로
+    만들지 않고 필요한 필드의 배열만 위치(iloc)로 꺼내 쓴다. 원본 컬럼이 없는
+    필드는 결측값이다.
+    """
+
+    def __init__(self, df):
+        self._size = len(df)
+        self._numeric = {}
+        self._codes = {}
+        self._tables = {}
+
+        for field, column in NUMERIC_FIELDS.items():
+            if column in df.columns and df[column].dtype == np.float64:
+                # 이미 float64인 컬럼(스냅샷에서 메모리 매핑된 배열 등)은 복사하지 않고 그대로 쓴다
+                values = np.asarray(df[column].array).view()
+            elif column in df.columns:
+                values = pd.to_numeric(df[column], errors="coerce").to_numpy(
+                    dtype="float64", na_value=np.nan
+                )
+            else:
+                values = np.full(self._size, np.nan)
+            values.flags.writeable = False
+            self._numeric[field] = values
+
+        for field, column in TEXT_FIELDS.items():
+            if column in df.columns:
+                codes, uniques = pd.factorize(df[column])
+            else:
+                codes, uniques = np.full(self._size, -1), []
+            # 결측값 코드 -1은 표의 마지막 칸(pd.NA, DataFrame에서 꺼낸 값과 같음)을 가리킨다
+            table = np.array(
+                [sys.intern(str(value)) for value in uniques] + [pd.NA], dtype=object
+            )
+            codes = codes.astype("int32")
+            for array in (codes, table):
+                array.flags.writeable = False
+            self._codes[field] = codes
+            self._tables[field] = table
+
+    def __len__(self):
+        return self._size
+
+    def numeric(self, field, positions=None):
+        """숫자 필드 배열 (positions를 주면 해당 행들만)"""
+        values = self._numeric[field]
+        return values if positions is None else values[positions]
+
+    def text(self, field, positions=None):
+        """문자열 필드 값 배열 (object 배열, 결측값은 pd.NA)"""
+        codes = self._codes[field]
+        return self._tables[field][codes if positions is None else codes[positions]]
+
+    def value(self, field, position):
+        """한 행의 필드 값 (숫자 필드는 float, 문자열 필드는 str 또는 pd.NA)"""
+        if field in self._numeric:
+            return float(self._numeric[field][position])
+        return self._tables[field][self._codes[field][position]]
+
+    def measure_text(self, field, unit, positions=None):
+        """숫자 필드를 "값단위" 문자열 리스트로 변환 (결측값은 "정보없음")"""
+        values = self.numeric(field, positions).tolist()
+        if field in INTEGER_FIELDS:
+            return ["정보없음" if v != v else f"{int(v)}{unit}" for v in values]
+        return ["정보없음" if v != v else f"{v}{unit}" for v in values]
+
+    def record(self, position):
+        return ShelterRecord(self, position)
+
+    def records(self, positions):
+        return [ShelterRecord(self, position) for position in positions]
+
+
+class ShelterRecord:
+    """저장소의 쉼터 한 곳을 가리키는 읽기 전용 보기 (필드는 속성으로 접근)"""
+
+    __slots__ = ("_store", "position")
+
+    def __init__(self, store, position):
+        self._store = store
+        self.position = int(position)
+
+    def __getattr__(self, field):
+        if field.startswith("_"):
+            raise AttributeError(field)
+        try:
+            return self._store.value(field, self.position)
+        except KeyError:
+            raise AttributeError(field) from None
+
+    def __repr__(self):
+        return f"ShelterRecord({self.position}, {self.name!r})"
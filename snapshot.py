@@ -0,0 +1,198 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# 스냅샷 형식이 바뀌면 올려서 예전 스냅샷을 무효화
+SNAPSHOT_SCHEMA_VERSION = 2
+
+_META_FILE = "meta.json"
+
+
+def snapshot_path_for(csv_path):
+    """CSV 파일에 대응하는 스냅샷 디렉터리 경로"""
+    return os.path.splitext(csv_path)[0] + ".snapshot"
+
+
+def _array_file(path, index, part):
+    return os.path.join(path, f"col{index:03d}_{part}.npy")
+
+
+def _map_array(file_path):
+    """.npy 파일을 읽기 전용 메모리 매핑으로 열어 (복사 없는) 일반 ndarray로 반환"""
+    return np.asarray(np.load(file_path, mmap_mode="r"))
+
+
+def _save_array(file_path, array):
+    """배열을 임시 파일에 쓴 뒤 교체 (이전 스냅샷을 매핑 중인 DataFrame이 있어도 안전)"""
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, file_path)
+
+
+def write_snapshot(df, path, source_checksum):
+    """전처리가 끝난 DataFrame을 컬럼별 .npy 파일 스냅샷으로 저장
+
+    숫자 컬럼은 값 배열 그대로, nullable 정수 컬럼은 값/결측 마스크 배열로,
+    문자열 컬럼은 범주 코드 배열과 meta.json의 범주 목록으로 저장한다.
+    meta.json을 마지막에 원자적으로 써서, 중간에 실패한 스냅샷은 읽히지 않는다.
+    """
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, _META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    columns = []
+    for index, (name, series) in enumerate(df.items()):
+        dtype = str(series.dtype)
+        if isinstance(series.dtype, pd.Int64Dtype):
+            kind = "nullable_int"
+            _save_array(
+                _array_file(path, index, "values"), series.fillna(0).to_numpy("int64")
+            )
+            _save_array(_array_file(path, index, "mask"), series.isna().to_numpy())
+            columns.append({"name": name, "kind": kind, "dtype": dtype})
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            kind = "numeric"
+            _save_array(_array_file(path, index, "values"), series.to_numpy())
+            columns.append({"name": name, "kind": kind, "dtype": dtype})
+        else:
+            kind = "categorical"
+            codes, categories = pd.factorize(series)
+            _save_array(_array_file(path, index, "codes"), codes.astype("int32"))
+            columns.append(
+                {
+                    "name": name,
+                    "kind": kind,
+                    "dtype": dtype,
+                    "categories": [str(value) for value in categories],
+                }
+            )
+
+    meta = {
+        "schema_version": SNAPSHOT_SCHEMA_VERSION,
+        "source_checksum": source_checksum,
+        "rows": len(df),
+        "columns": columns,
+    }
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, meta_path)
+
+
+def load_snapshot(path, source_checksum):
+    """스냅샷을 메모리 매핑으로 읽어 DataFrame 반환
+
+    숫자/nullable 정수 컬럼은 복사 없이 매핑된 배열을 그대로 쓴다 (쓰기가
+    일어나면 copy-on-write로 그때 복사된다). 문자열 컬럼은 매핑된 범주 코드를
+    문자열 배열로 풀어 만들므로 메모리에 올라간다.
+
+    스냅샷이 없거나, 형식 버전이 다르거나, 원본 CSV 해시가 달라 오래된 경우
+    None을 반환한다.
+    """
+    try:
+        with open(os.path.join(path, _META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        meta.get("schema_version") != SNAPSHOT_SCHEMA_VERSION
+        or meta.get("source_checksum") != source_checksum
+    ):
+        return None
+
+    data = {}
+    try:
+        for index, column in enumerate(meta["columns"]):
+            kind = column["kind"]
+            if kind == "nullable_int":
+                values = _map_array(_array_file(path, index, "values"))
+                mask = _map_array(_array_file(path, index, "mask"))
+                data[column["name"]] = pd.Series(
+                    pd.arrays.IntegerArray(values, mask, copy=False), copy=False
+                )
+            elif kind == "numeric":
+                values = _map_array(_array_file(path, index, "values"))
+                data[column["name"]] = pd.Series(
+                    values, dtype=column["dtype"], copy=False
+                )
+            else:
+                codes = _map_array(_array_file(path, index, "codes"))
+                categories = pd.Index(column["categories"], dtype=column["dtype"])
+                values = pd.Categorical.from_codes(codes, categories=categories)
+                data[column["name"]] = pd.Series(values).astype(column["dtype"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+    df = pd.DataFrame(data, copy=False)
+    if len(df) != meta["rows"]:
+        return None
+    return df
+
+
+def _precomputed_file(path, name):
+    return os.path.join(path, f"{name}.npz")
+
+
+def write_precomputed(path, name, arrays, source_checksum):
+    """스냅샷과 함께 쓰는 사전 계산 배열들(arrays dict)을 name.npz로 저장
+
+    원본 CSV 해시를 함께 저장해, 데이터가 바뀌면 load_precomputed가 무시한다.
+    """
+    os.makedirs(path, exist_ok=True)
+    file_path = _precomputed_file(path, name)
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            schema_version=SNAPSHOT_SCHEMA_VERSION,
+            source_checksum=source_checksum,
+            **arrays,
+        )
+    os.replace(tmp_path, file_path)
+
+
+def load_precomputed(path, name, source_checksum):
+    """write_precomputed로 저장한 배열 dict 반환 (없거나 오래되었으면 None)"""
+    try:
+        with np.load(_precomputed_file(path, name)) as data:
+            if (
+                int(data["schema_version"]) != SNAPSHOT_SCHEMA_VERSION
+                or str(data["source_checksum"]) != source_checksum
+            ):
+                return None
+            return {
+                key: data[key]
+                for key in data.files
+                if key not in ("schema_version", "source_checksum")
+            }
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def main(argv):
+    """CSV를 읽어 전처리한 뒤 스냅샷을 생성 (배포 빌드 단계용)"""
+    from utils import (
+        DATA_PATH,
+        file_checksum,
+        load_data,
+        preprocess_data,
+        reload_dataset,
+    )
+
+    csv_path = argv[1] if len(argv) > 1 else DATA_PATH
+    path = snapshot_path_for(csv_path)
+    df = preprocess_data(load_data(csv_path))
+    write_snapshot(df, path, file_checksum(csv_path))
+    # 이웃 그래프와 자치구 요약도 미리 계산해 스냅샷에 저장
+    reload_dataset(csv_path)
+    print(f"스냅샷 생성 완료: {path} ({len(df)}행)")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,354 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # 지구 반지름 6371km
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180  # 위도 1도당 거리 (약 111km)
+
+
+def haversine_array(lon1, lat1, lon2, lat2):
+    """두 지점(또는 지점 배열) 간의 거리를 킬로미터 단위 NumPy 배열로 계산
+
+    인자는 NumPy 브로드캐스팅 규칙을 따른다. 예를 들어 사용자 좌표 배열을
+    (m, 1) 모양으로, 쉼터 좌표 배열을 (n,) 모양으로 넘기면 (m, n) 거리 행렬을
+    반환한다. 좌표가 NaN인 지점의 거리는 NaN이다.
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(v) for v in (lon1, lat1, lon2, lat2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * np.arcsin(np.sqrt(a)) * EARTH_RADIUS_KM
+
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_cell(lat, lon, precision=7):
+    """좌표가 속한 geohash 칸의 (geohash 문자열, 중심 위도, 중심 경도, 외접원 반지름(km))
+
+    칸 안의 모든 지점은 중심에서 외접원 반지름 이내에 있다.
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # 경도와 위도를 번갈아 가며 구간을 반으로 나눈다
+        interval, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_BASE32[value])
+            bits, value = 0, 0
+
+    center_lat = (lat_range[0] + lat_range[1]) / 2
+    center_lon = (lon_range[0] + lon_range[1]) / 2
+    radius_km = haversine_array(
+        center_lon, center_lat, np.array(lon_range * 2), np.repeat(lat_range, 2)
+    ).max()
+    return "".join(chars), center_lat, center_lon, float(radius_km)
+
+
+class SpatialIndex:
+    """위도/경도 격자(grid) 기반 공간 인덱스
+
+    좌표를 cell_km 크기의 격자 칸으로 나누고 칸 번호 순으로 정렬해 두어,
+    반경 검색과 k-최근접 검색이 주변 칸에 속한 쉼터만 거리 계산하도록 한다.
+    반환되는 위치(position)는 생성 시 넘긴 배열의 정수 위치(iloc)이다.
+    """
+
+    def __init__(self, lats, lons, cell_km=0.5):
+        lats = np.asarray(lats, dtype="float64")
+        lons = np.asarray(lons, dtype="float64")
+        valid = ~(np.isnan(lats) | np.isnan(lons))
+
+        self.cell_km = cell_km
+        positions = np.flatnonzero(valid)
+        self._lats = lats
+        self._lons = lons
+
+        if len(positions) == 0:
+            self._origin = (0.0, 0.0)
+            self._cell_deg = (1.0, 1.0)
+            self._n_cols = 1
+            self._cell_keys = np.empty(0, dtype="int64")
+            self._cell_starts = np.empty(1, dtype="int64")
+            self._order = positions
+            return
+
+        valid_lats, valid_lons = lats[positions], lons[positions]
+        ref_lat = np.radians(valid_lats.mean())
+        self._origin = (valid_lats.min(), valid_lons.min())
+        self._cell_deg = (
+            cell_km / KM_PER_DEGREE,
+            cell_km / (KM_PER_DEGREE * max(np.cos(ref_lat), 1e-6)),
+        )
+        rows, cols = self._cell_of(valid_lats, valid_lons)
+        self._n_cols = int(cols.max()) + 1
+        self._n_rows = int(rows.max()) + 1
+
+        # 칸 번호 순으로 정렬해 같은 칸의 쉼터들이 연속 구간이 되도록 한다
+        keys = rows * self._n_cols + cols
+        sort = np.argsort(keys, kind="stable")
+        self._order = positions[sort]
+        self._cell_keys, starts = np.unique(keys[sort], return_index=True)
+        self._cell_starts = np.append(starts, len(sort))
+
+        # 여러 스레드가 동시에 조회하므로 인덱스 배열은 쓰기 금지
+        for array in (self._order, self._cell_keys, self._cell_starts):
+            array.flags.writeable = False
+
+    def __len__(self):
+        return len(self._order)
+
+    def _cell_of(self, lats, lons):
+        rows = np.floor((lats - self._origin[0]) / self._cell_deg[0]).astype("int64")
+        cols = np.floor((lons - self._origin[1]) / self._cell_deg[1]).astype("int64")
+        return rows, cols
+
+    def _candidates(self, lat, lon, radius_km):
+        """반경을 덮는 격자 칸들에 속한 쉼터 위치 반환"""
+        lat_span = radius_km / KM_PER_DEGREE
+        # 원의 가장 넓은 경도 폭은 극에 가까운 쪽 위도에서 생기므로 그 위도로 계산
+        far_lat = min(abs(lat) + lat_span, 89.9)
+        lon_span = radius_km / (KM_PER_DEGREE * np.cos(np.radians(far_lat)))
+        return self._cells_in(
+            lat - lat_span, lon - lon_span, lat + lat_span, lon + lon_span
+        )
+
+    def _cells_in(self, south, west, north, east):
+        """위도/경도 범위에 걸친 격자 칸들에 속한 쉼터 위치 반환"""
+        if len(self._order) == 0:
+            return self._order
+        (row_min, row_max), (col_min, col_max) = self._cell_of(
+            np.array([south, north]), np.array([west, east])
+        )
+        row_min, row_max = max(row_min, 0), min(row_max, self._n_rows - 1)
+        col_min, col_max = max(col_min, 0), min(col_max, self._n_cols - 1)
+        if row_min > row_max or col_min > col_max:
+            return self._order[:0]
+
+        # 행마다 연속된 칸 번호 구간을 이진 탐색으로 찾는다
+        row_keys = np.arange(row_min, row_max + 1) * self._n_cols
+        lo = np.searchsorted(self._cell_keys, row_keys + col_min, side="left")
+        hi = np.searchsorted(self._cell_keys, row_keys + col_max, side="right")
+        starts, ends = self._cell_starts[lo], self._cell_starts[hi]
+        return np.concatenate(
+            [self._order[s:e] for s, e in zip(starts, ends) if s < e]
+            or [self._order[:0]]
+        )
+
+    def distances(self, lat, lon, positions):
+        """한 지점에서 positions 위치 쉼터들까지의 거리 배열 (km)"""
+        return haversine_array(lon, lat, self._lons[positions], self._lats[positions])
+
+    def _sorted_by_distance(self, lat, lon, positions):
+        distances = haversine_array(
+            lon, lat, self._lons[positions], self._lats[positions]
+        )
+        # 거리가 같으면 원래 행 순서를 유지
+        order = np.lexsort((positions, distances))
+        return positions[order], distances[order]
+
+    def _within(self, lat, lon, radius_km, mask=None):
+        """반경 이내(mask가 있으면 mask가 True인 행만) 쉼터의 (위치, 거리), 정렬 안 함"""
+        positions = self._candidates(lat, lon, radius_km)
+        if mask is not None:
+            positions = positions[mask[positions]]
+        distances = haversine_array(
+            lon, lat, self._lons[positions], self._lats[positions]
+        )
+        within = distances <= radius_km
+        return positions[within], distances[within]
+
+    def query_bbox(self, south, west, north, east, mask=None):
+        """위도 south~north, 경도 west~east 상자 안 쉼터 위치 배열 (정렬 안 함)
+
+        mask(행 수 길이의 불리언 배열)를 주면 mask가 True인 쉼터만 반환한다.
+        """
+        positions = self._cells_in(south, west, north, east)
+        if mask is not None:
+            positions = positions[mask[positions]]
+        lats, lons = self._lats[positions], self._lons[positions]
+        inside = (lats >= south) & (lats <= north) & (lons >= west) & (lons <= east)
+        return positions[inside]
+
+    def query_radius(self, lat, lon, radius_km, mask=None):
+        """반경 radius_km 이내 쉼터의 (위치, 거리) 배열을 거리순으로 반환
+
+        mask(행 수 길이의 불리언 배열)를 주면 mask가 True인 쉼터만 반환한다.
+        """
+        positions, distances = self._within(lat, lon, radius_km, mask)
+        order = np.lexsort((positions, distances))
+        return positions[order], distances[order]
+
+    def nearest_within(self, lat, lon, radius_km, k, mask=None):
+        """반경 이내 쉼터 중 가까운 k개의 (위치, 거리, 반경 이내 전체 개수) 반환
+
+        전체를 정렬하지 않고 k번째 거리 이하인 후보만 골라 정렬한다.
+        """
+        positions, distances = self._within(lat, lon, radius_km, mask)
+        total = len(positions)
+        if total > k > 0:
+            kth = np.partition(distances, k - 1)[k - 1]
+            nearest = distances <= kth
+            positions, distances = positions[nearest], distances[nearest]
+        order = np.lexsort((positions, distances))[: max(k, 0)]
+        return positions[order], distances[order], total
+
+    def query_knn(self, lat, lon, k):
+        """가장 가까운 k개 쉼터의 (위치, 거리) 배열을 거리순으로 반환"""
+        if k <= 0 or len(self._order) == 0:
+            return self._order[:0], np.empty(0)
+        if k >= len(self._order):
+            return self._sorted_by_distance(lat, lon, self._order)
+
+        # 후보가 k개 이상 모일 때까지 탐색 범위를 두 배씩 넓힌다
+        radius_km = self.cell_km
+        while True:
+            positions = self._candidates(lat, lon, radius_km)
+            if len(positions) >= k or len(positions) == len(self._order):
+                break
+            radius_km *= 2
+
+        # k번째 거리까지의 원을 다시 조회해야 범위 밖의 더 가까운 쉼터를 놓치지 않는다
+        positions, distances = self._sorted_by_distance(lat, lon, positions)
+        positions, distances = self.query_radius(lat, lon, distances[k - 1])
+        return positions[:k], distances[:k]
+
+    def knn_table(self, k, positions=None):
+        """모든 쉼터 각각의 가까운 k개 이웃 (위치, 거리) 표 반환 (자기 자신 제외)
+
+        격자 칸 단위로 칸 안의 쉼터들과 주변 칸 후보 사이의 거리 행렬을 한 번에
+        계산한다. 후보 범위는 칸 안 모든 쉼터의 k번째 이웃까지 덮을 때까지
+        두 배씩 넓히므로 결과는 정확하다. 반환값은 (행 수, k) 모양이며,
+        좌표가 없거나 이웃이 k개보다 적은 칸은 위치 -1, 거리 inf이다.
+        positions를 주면 그 행들이 속한 칸만 계산하고 나머지 행은 비워 둔다.
+        """
+        n = len(self._lats)
+        neighbors = np.full((n, k), -1, dtype="int64")
+        distances = np.full((n, k), np.inf)
+        take = min(k, len(self._order) - 1)
+        if take <= 0:
+            return neighbors, distances
+
+        wanted = None
+        cells = range(len(self._cell_keys))
+        if positions is not None:
+            wanted = np.zeros(n, dtype=bool)
+            wanted[positions] = True
+            slots = np.flatnonzero(wanted[self._order])
+            cells = np.unique(np.searchsorted(self._cell_starts, slots, "right") - 1)
+
+        for cell in cells:
+            start, end = self._cell_starts[cell], self._cell_starts[cell + 1]
+            members = self._order[start:end]
+            if wanted is not None:
+                members = members[wanted[members]]
+            lats, lons = self._lats[members], self._lons[members]
+            # 첫 쉼터 기준으로 spread + radius 원을 조회하면 칸 안 모든 쉼터의
+            # radius 이내 쉼터가 빠짐없이 후보에 들어간다 (삼각 부등식)
+            spread = haversine_array(lons[0], lats[0], lons, lats).max()
+            radius_km = self.cell_km
+            while True:
+                candidates = self._candidates(lats[0], lons[0], spread + radius_km)
+                if len(candidates) <= take:
+                    radius_km *= 2
+                    continue
+                pair = haversine_array(
+                    lons[:, np.newaxis],
+                    lats[:, np.newaxis],
+                    self._lons[candidates],
+                    self._lats[candidates],
+                )
+                pair[members[:, np.newaxis] == candidates] = np.inf
+                nearest = np.argpartition(pair, take - 1, axis=1)[:, :take]
+                nearest_distances = np.take_along_axis(pair, nearest, axis=1)
+                if nearest_distances.max() <= radius_km or len(candidates) == len(
+                    self._order
+                ):
+                    break
+                radius_km *= 2
+
+            # k번째 거리와 같은 후보가 더 있으면 위치가 작은 쪽을 고른다 (argpartition은
+            # 동점 중 아무거나 고르므로, 일부 행만 다시 계산해도 전체 계산과 같도록)
+            kth = nearest_distances.max(axis=1)
+            for row in np.flatnonzero((pair <= kth[:, np.newaxis]).sum(axis=1) > take):
+                nearest[row] = np.lexsort((candidates, pair[row]))[:take]
+                nearest_distances[row] = pair[row, nearest[row]]
+
+            # 거리가 같으면 원래 행 순서를 유지
+            nearest = candidates[nearest]
+            order = np.lexsort((nearest, nearest_distances), axis=-1)
+            neighbors[members, :take] = np.take_along_axis(nearest, order, axis=1)
+            distances[members, :take] = np.take_along_axis(
+                nearest_distances, order, axis=1
+            )
+        return neighbors, distances
+
+
+def _unit_vectors(lats, lons):
+    """위도/경도를 단위 구 위의 3차원 벡터로 변환 (좌표가 NaN이면 NaN 벡터)"""
+    lats, lons = np.radians(lats), np.radians(lons)
+    cos_lats = np.cos(lats)
+    return np.column_stack(
+        [cos_lats * np.cos(lons), cos_lats * np.sin(lons), np.sin(lats)]
+    )
+
+
+def nearest_batch(user_lats, user_lons, lats, lons, k, masks=None, groups=None):
+    """여러 사용자 지점 각각에서 가까운 k개 지점의 (위치, 거리) 행렬 반환
+
+    단위 벡터 내적은 두 지점 사이 중심각의 코사인이라 거리 순서와 반대로
+    단조이므로, (사용자 수, 지점 수) 내적 행렬을 행렬 곱 한 번으로 구하고
+    행마다 np.argpartition으로 k개만 고른 뒤 그 k개만 하버사인 거리를 계산한다.
+    지점 수가 수천 개 정도일 때 사용자 지점을 적당한 크기로 나눠 부르는 용도이다.
+
+    masks는 (그룹 수, 지점 수) 불리언 배열로 그룹별 후보 지점을 나타내고,
+    groups는 사용자 지점마다 그룹 번호이다. 후보가 k개보다 적은 칸은
+    위치 -1, 거리 NaN으로 채운다.
+    """
+    user_lats = np.asarray(user_lats, dtype="float64")
+    user_lons = np.asarray(user_lons, dtype="float64")
+    lats = np.asarray(lats, dtype="float64")
+    lons = np.asarray(lons, dtype="float64")
+
+    similarity = _unit_vectors(user_lats, user_lons) @ _unit_vectors(lats, lons).T
+    np.copyto(similarity, -np.inf, where=np.isnan(similarity))
+    if masks is not None:
+        np.copyto(similarity, -np.inf, where=~masks[groups])
+
+    m, n = similarity.shape
+    positions = np.full((m, k), -1, dtype="int64")
+    distances = np.full((m, k), np.nan)
+    take = min(k, n)
+    if take == 0:
+        return positions, distances
+
+    if take < n:
+        # 내적이 큰 take개 (부호를 바꾼 행렬 사본을 만들지 않도록 뒤쪽에서 고름)
+        candidates = np.argpartition(similarity, n - take, axis=1)[:, n - take :]
+    else:
+        candidates = np.broadcast_to(np.arange(n), (m, n)).copy()
+    found = np.isfinite(np.take_along_axis(similarity, candidates, axis=1))
+    candidate_distances = haversine_array(
+        user_lons[:, np.newaxis],
+        user_lats[:, np.newaxis],
+        lons[candidates],
+        lats[candidates],
+    )
+    candidate_distances[~found] = np.inf
+
+    # 거리가 같으면 원래 행 순서를 유지
+    order = np.lexsort((candidates, candidate_distances), axis=-1)
+    candidates = np.take_along_axis(candidates, order, axis=1)
+    candidate_distances = np.take_along_axis(candidate_distances, order, axis=1)
+
+    found = np.isfinite(candidate_distances)
+    positions[:, :take] = np.where(found, candidates, -1)
+    distances[:, :take] = np.where(found, candidate_distances, np.nan)
+    return positions, distances
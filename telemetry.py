@@ -0,0 +1,232 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger("shelter.telemetry")
+
+
+def _measurement(value):
+    if value is None:
+        return None
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(value)
+    return value
+
+
+def parse_record(record):
+    """측정값 레코드를 (쉼터 ID, 온도, 사용자 수, timestamp)로 변환
+
+    dict가 아니거나, shelter_id가 없거나, 값을 숫자로 바꿀 수 없으면 None을
+    반환한다. 온도/사용자 수가 없으면 None, timestamp가 없으면 현재 시각이다.
+    """
+    if not isinstance(record, dict) or record.get("shelter_id") is None:
+        return None
+    try:
+        temperature = _measurement(record.get("current_temperature"))
+        occupancy = _measurement(record.get("current_occupancy"))
+        timestamp = _measurement(record.get("timestamp") or time.time())
+    except (TypeError, ValueError):
+        return None
+    return str(record["shelter_id"]), temperature, occupancy, timestamp
+
+
+class TelemetryStore:
+    """쉼터별 실시간 온도/사용자 수 저장소
+
+    정적 데이터셋과 분리해 메모리에만 보관하며, 쉼터 ID마다 배열의 칸(slot)을
+    하나씩 배정해 갱신은 O(1), 조회는 slot 배열 인덱싱 한 번으로 처리한다.
+    쉼터 ID는 utils.shelter_ids()와 같은 "위치코드:쉼터명칭" 형식이다.
+    """
+
+    def __init__(self, capacity=1024):
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._temperature = np.full(capacity, np.nan)
+        self._occupancy = np.full(capacity, np.nan)
+        self._updated_at = np.full(capacity, np.nan)
+        self.version = 0
+        # 쉼터 ID → slot 대응이 바뀔 때마다 (새 slot 배정, clear) 증가
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _slot(self, shelter_id):
+        slot = self._slots.get(shelter_id)
+        if slot is None:
+            slot = len(self._slots)
+            if slot == len(self._temperature):
+                grow = len(self._temperature)
+                self._temperature = np.append(self._temperature, np.full(grow, np.nan))
+                self._occupancy = np.append(self._occupancy, np.full(grow, np.nan))
+                self._updated_at = np.append(self._updated_at, np.full(grow, np.nan))
+            self._slots[shelter_id] = slot
+            self.generation += 1
+        return slot
+
+    def ingest(self, records):
+        """측정값 레코드들을 한 번에 반영하고 반영한 개수 반환
+
+        레코드는 shelter_id와 current_temperature/current_occupancy(선택),
+        timestamp(선택, 초 단위 epoch)를 가진 dict이다. 모든 레코드를 먼저
+        검사/변환하고 잘못된 레코드(parse_record가 None)는 건너뛴다. 이전보다
+        오래된 timestamp의 레코드는 무시한다.
+        """
+        parsed = [p for p in map(parse_record, records) if p is not None]
+        count = 0
+        with self._lock:
+            try:
+                for shelter_id, temperature, occupancy, timestamp in parsed:
+                    slot = self._slot(shelter_id)
+                    if self._updated_at[slot] > timestamp:
+                        continue
+
+                    if temperature is not None:
+                        self._temperature[slot] = temperature
+                    if occupancy is not None:
+                        self._occupancy[slot] = occupancy
+                    self._updated_at[slot] = timestamp
+                    count += 1
+            finally:
+                # 일부만 반영되고 중단되어도 캐시가 이전 값을 쓰지 않도록 버전을 올린다
+                if count:
+                    self.version += 1
+        return count
+
+    def update(self, shelter_id, temperature=None, occupancy=None, timestamp=None):
+        """쉼터 하나의 측정값 반영"""
+        return self.ingest(
+            [
+                {
+                    "shelter_id": shelter_id,
+                    "current_temperature": temperature,
+                    "current_occupancy": occupancy,
+                    "timestamp": timestamp,
+                }
+            ]
+        )
+
+    def ingest_lines(self, lines):
+        """JSONL 형식의 줄들을 읽어 반영 (잘못된 줄은 건너뜀)"""
+        records = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return self.ingest(records)
+
+    def ingest_jsonl(self, path):
+        """JSONL 파일 전체를 읽어 반영"""
+        with open(path, encoding="utf-8") as f:
+            return self.ingest_lines(f)
+
+    def slots_for(self, shelter_ids):
+        """쉼터 ID 배열에 대응하는 slot 배열 반환 (측정값이 없으면 -1)"""
+        slots = self._slots
+        return np.fromiter(
+            (slots.get(shelter_id, -1) for shelter_id in shelter_ids),
+            dtype="int64",
+            count=len(shelter_ids),
+        )
+
+    def lookup(self, slots):
+        """slot 배열에 대응하는 (온도, 사용자 수) 배열 반환 (값이 없으면 NaN)"""
+        slots = np.asarray(slots, dtype="int64")
+        found = slots >= 0
+        temperature = np.full(len(slots), np.nan)
+        occupancy = np.full(len(slots), np.nan)
+        temperature[found] = self._temperature[slots[found]]
+        occupancy[found] = self._occupancy[slots[found]]
+        return temperature, occupancy
+
+    def clear(self):
+        with self._lock:
+            self._slots = {}
+            self._temperature[:] = np.nan
+            self._occupancy[:] = np.nan
+            self._updated_at[:] = np.nan
+            self.version += 1
+            self.generation += 1
+
+
+class TelemetryFileFeed:
+    """JSONL 파일에 추가되는 측정값을 주기적으로 읽어 저장소에 반영하는 백그라운드 피드
+
+    마지막으로 읽은 위치부터 새로 추가된 줄만 읽으며, 파일이 잘리거나 교체되면
+    처음부터 다시 읽는다.
+    """
+
+    def __init__(self, store, path, interval=5.0):
+        self.store = store
+        self.path = path
+        self.interval = interval
+        self._offset = 0
+        self._inode = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """새로 추가된 줄을 읽어 반영하고 반영한 개수 반환"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return 0
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._inode = stat.st_ino
+            self._offset = 0
+        if stat.st_size == self._offset:
+            return 0
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # 아직 줄바꿈이 오지 않은 마지막 줄은 다음 번에 읽는다
+        complete = data[: data.rfind(b"\n") + 1]
+        self._offset += len(complete)
+        return self.store.ingest_lines(
+            complete.decode("utf-8", errors="replace").splitlines()
+        )
+
+    def _poll_logged(self):
+        """poll()의 오류를 로그로 남기고 다음 주기에 계속 진행"""
+        try:
+            return self.poll()
+        except Exception:
+            logger.exception("측정값 피드를 읽지 못했습니다: %s", self.path)
+            return 0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._poll_logged()
+
+    def start(self):
+        if self._thread is None:
+            self._poll_logged()
+            self._thread = threading.Thread(
+                target=self._run, name="telemetry-feed", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+# 프로세스 전체에서 공유하는 저장소
+_store = TelemetryStore()
+
+
+def get_telemetry_store():
+    """공유 TelemetryStore 반환"""
+    return _store
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+from cache import TTLCache
+from config import LANDMARKS, RESULT_CACHE_CONFIG
+from shelter_store import NUMERIC_FIELDS, TEXT_FIELDS
+from telemetry import get_telemetry_store
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """테스트마다 공유 데이터셋/캐시/측정값 저장소를 비운 상태로 시작"""
+    monkeypatch.setattr(utils, "_dataset", None)
+    monkeypatch.setattr(utils, "_dataset_stat", None)
+    monkeypatch.setattr(utils, "_refresh_failed_stat", None)
+    monkeypatch.setattr(utils, "_telemetry_slots", (None, None))
+    utils._result_cache.clear()
+    utils._shelter_layer_cache.clear()
+    get_telemetry_store().clear()
+    yield
+    utils._result_cache.clear()
+    utils._shelter_layer_cache.clear()
+    get_telemetry_store().clear()
+
+
+@pytest.fixture
+def source():
+    return pd.read_csv(utils.DATA_PATH)
+
+
+def _write(df, path):
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def _mutate(df):
+    """삭제/좌표 변경/좌표 외 값 변경/이름 변경/중간 삽입을 섞은 새 CSV 내용"""
+    df = df.copy()
+    df.loc[30:34, "위도"] = df.loc[30:34, "위도"] + 0.001
+    df.loc[40:44, "current_temperature"] = 45
+    df.loc[45:46, "에어컨보유대수"] = 99
+    df.loc[50, "쉼터명칭"] = df.loc[50, "쉼터명칭"] + "(이전)"
+
+    inserted = df.iloc[100:108].copy()
+    inserted["쉼터명칭"] = inserted["쉼터명칭"] + "-신규"
+    inserted["경도"] = inserted["경도"] + 0.0005
+    df = df.drop(index=range(10, 20))
+    return pd.concat([df.iloc[:500], inserted, df.iloc[500:]], ignore_index=True)
+
+
+def _assert_same_dataset(actual, expected):
+    np.testing.assert_array_equal(actual.shelter_ids, expected.shelter_ids)
+    for field in NUMERIC_FIELDS:
+        np.testing.assert_array_equal(
+            actual.store.numeric(field), expected.store.numeric(field)
+        )
+    for field in TEXT_FIELDS:
+        assert actual.store.text(field).tolist() == expected.store.text(field).tolist()
+
+    assert actual.filter_index.categories == expected.filter_index.categories
+    for column, values in expected.filter_index.categories.items():
+        for value in values:
+            np.testing.assert_array_equal(
+                actual.filter_index.mask({column: [value]}),
+                expected.filter_index.mask({column: [value]}),
+            )
+
+    np.testing.assert_array_equal(
+        actual.neighbor_graph.neighbors, expected.neighbor_graph.neighbors
+    )
+    np.testing.assert_array_equal(
+        actual.neighbor_graph.distances, expected.neighbor_graph.distances
+    )
+    pd.testing.assert_frame_equal(actual.districts, expected.districts)
+
+
+def test_refresh_matches_fresh_build(tmp_path, source):
+    path = _write(source, tmp_path / "shelters.csv")
+    old = utils.get_dataset(path)
+
+    mutated = _mutate(source)
+    _write(mutated, path)
+    changes = utils.refresh_dataset(path)
+    refreshed = utils.get_dataset(path)
+
+    # 바뀐 행만 반영되었는지 (전체 다시 읽기로 넘어가지 않았는지)
+    assert not changes.full_reload
+    assert len(changes.inserted) == 9
+    assert len(changes.deleted) == 11
+    assert len(changes.updated) == 12
+    assert refreshed.version > old.version
+
+    # 같은 내용을 다른 경로(스냅샷 없음)에서 처음부터 만든 데이터셋과 비교
+    other = tmp_path / "fresh"
+    other.mkdir()
+    other_path = _write(mutated, other / "shelters.csv")
+    expected = utils._build_dataset(
+        other_path, utils.file_checksum(other_path), version=0
+    )
+    _assert_same_dataset(refreshed, expected)
+
+
+def _query_points(n=20, seed=0):
+    """랜드마크 주변 위치 (같은 geohash 칸에 여러 번 들어가도록 일부는 아주 가깝게)"""
+    rng = np.random.default_rng(seed)
+    points = []
+    for i in range(n):
+        _, lat, lon = LANDMARKS[i % len(LANDMARKS)]
+        lat, lon = lat + rng.normal(0, 0.01), lon + rng.normal(0, 0.01)
+        points.append((lat, lon))
+        points.append((lat + 1e-5, lon - 1e-5))
+    return points
+
+
+FILTERS = [
+    {},
+    {"district": ["종로구", "중구"]},
+    {"facility_type": ["회원이용시설"], "has_ac_filter": ["있음"]},
+]
+
+
+def _answers(points):
+    answers = []
+    for lat, lon in points:
+        for filters in FILTERS:
+            answers.append(utils.nearby_records(lat, lon, limit=10, **filters))
+        for age in (25, 70):
+            answers.append(utils.recommendation_records(lat, lon, age, 3))
+        answers.append(utils.get_recommended_shelter(lat, lon, 70, "테스트"))
+    return answers
+
+
+def test_cached_results_match_uncached(monkeypatch):
+    points = _query_points()
+    monkeypatch.setitem(RESULT_CACHE_CONFIG, "enabled", False)
+    uncached = _answers(points)
+
+    monkeypatch.setitem(RESULT_CACHE_CONFIG, "enabled", True)
+    # 상한이 작은 캐시로도 같은 결과이고 항목 수가 상한을 넘지 않는지
+    monkeypatch.setattr(utils, "_result_cache", TTLCache(maxsize=16, ttl=300))
+    first = _answers(points)
+    second = _answers(points)
+
+    assert first == uncached
+    assert second == uncached
+    assert 0 < len(utils._result_cache) <= 16
+
+
+def test_caches_do_not_leak_across_datasets(tmp_path, source, monkeypatch):
+    small = _write(source.iloc[::3], tmp_path / "small.csv")
+    full = _write(source, tmp_path / "full.csv")
+    points = _query_points(n=10, seed=1)
+
+    monkeypatch.setattr(utils, "DATA_PATH", small)
+    expected = _answers(points)
+    utils._result_cache.clear()
+
+    # 공유 데이터셋을 버리고 다른 파일로 다시 만들어도 버전이 겹치지 않아
+    # 버전을 키로 쓰는 캐시가 이전 데이터셋의 답을 돌려주지 않아야 함
+    monkeypatch.setattr(utils, "_dataset", None)
+    monkeypatch.setattr(utils, "DATA_PATH", full)
+    assert _answers(points) != expected
+    monkeypatch.setattr(utils, "_dataset", None)
+    monkeypatch.setattr(utils, "DATA_PATH", small)
+    assert _answers(points) == expected
+
+
+def test_telemetry_clear_then_reingest():
+    dataset = utils.get_dataset()
+    first, second = dataset.shelter_ids[:2]
+    store = get_telemetry_store()
+
+    store.ingest(
+        [
+            {"shelter_id": first, "current_temperature": 10},
+            {"shelter_id": second, "current_temperature": 20},
+        ]
+    )
+    temperature, _ = utils.live_status(dataset, [0, 1])
+    assert temperature.tolist() == [10, 20]
+
+    # 같은 수의 ID가 다른 순서로 들어와도 쉼터별 값이 섞이지 않아야 함
+    store.clear()
+    store.ingest(
+        [
+            {"shelter_id": second, "current_temperature": 99},
+            {"shelter_id": first, "current_temperature": 11},
+        ]
+    )
+    temperature, _ = utils.live_status(dataset, [0, 1])
+    assert temperature.tolist() == [11, 99]
@@ -1,12 +1,55 @@
 import pandas as pd
 import folium
-from math import radians, cos, sin, asin, sqrt
+import numpy as np
+from dataclasses import dataclass
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count, repeat
 import json
+import logging
+import os
+import re
+import threading
+from urllib.parse import urlencode
+
+from cache import TTLCache
+from cards import render_cards
+from config import BATCH_CONFIG, MAP_CONFIG, NEARBY_CONFIG, RESULT_CACHE_CONFIG
+from district_resolver import get_district_resolver
+from filter_engine import ALL_VALUE, FILTER_COLUMNS, FilterIndex
+from instrumentation import record_bytes, record_rows, stage, timed
+from map_layers import ShelterClusterLayer, ShelterViewportLayer
+from neighbor_graph import (
+    NeighborGraph,
+    build_neighbor_graph,
+    district_summary,
+    district_summary_from_arrays,
+    district_summary_to_arrays,
+    update_neighbor_graph,
+)
+from shelter_store import ShelterStore
+from snapshot import (
+    load_precomputed,
+    load_snapshot,
+    snapshot_path_for,
+    write_precomputed,
+    write_snapshot,
+)
+from spatial_index import SpatialIndex, geohash_cell, haversine_array, nearest_batch
+from telemetry import get_telemetry_store
+
+logger = logging.getLogger("shelter.dataset")
+
+# 쉼터 데이터 파일 경로
+DATA_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "shelter_with_details_by_address_filtered.csv",
+)
 
 
 # 데이터 로드
-def load_data():
-    df = pd.read_csv("shelter_with_details_by_address_filtered.csv")
+def load_data(path=DATA_PATH):
+    df = pd.read_csv(path)
 
     # 숫자형 컬럼들
     numeric_columns = {
@@ -113,11 +156,7 @@ def load_data():
 # 거리 계산 함수 (하버사인 공식)
 def haversine(lon1, lat1, lon2, lat2):
     """두 지점 간의 거리를 킬로미터 단위로 계산"""
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    return 2 * asin(sqrt(a)) * 6371  # 지구 반지름 6371km
+    return float(haversine_array(lon1, lat1, lon2, lat2))
 
 
 # 데이터 전처리 함수들
@@ -169,109 +208,730 @@ def has_ac(ac_count):
         return "있음"
 
 
+# 서울시 자치구 목록 (앞쪽 항목이 우선)
+SEOUL_DISTRICTS = [
+    "강남구",
+    "강동구",
+    "강북구",
+    "강서구",
+    "관악구",
+    "광진구",
+    "구로구",
+    "금천구",
+    "노원구",
+    "도봉구",
+    "동대문구",
+    "동작구",
+    "마포구",
+    "서대문구",
+    "서초구",
+    "성동구",
+    "성북구",
+    "송파구",
+    "양천구",
+    "영등포구",
+    "용산구",
+    "은평구",
+    "종로구",
+    "중구",
+    "중랑구",
+]
+
+_DISTRICT_PATTERN = re.compile("|".join(SEOUL_DISTRICTS))
+
+
 def extract_district(address):
     """도로명주소에서 자치구 추출"""
     if pd.isna(address):
         return "정보없음"
 
-    # 서울시 자치구 패턴 매칭
-    districts = [
-        "강남구",
-        "강동구",
-        "강북구",
-        "강서구",
-        "관악구",
-        "광진구",
-        "구로구",
-        "금천구",
-        "노원구",
-        "도봉구",
-        "동대문구",
-        "동작구",
-        "마포구",
-        "서대문구",
-        "서초구",
-        "성동구",
-        "성북구",
-        "송파구",
-        "양천구",
-        "영등포구",
-        "용산구",
-        "은평구",
-        "종로구",
-        "중구",
-        "중랑구",
-    ]
-
-    for district in districts:
-        if district in address:
-            return district
+    # 서울시 자치구 패턴 매칭 (주소에서 가장 먼저 나오는 자치구)
+    match = _DISTRICT_PATTERN.search(address)
+    if match:
+        return match.group()
 
     return "기타"
 
 
+# 벡터화된 분류 함수들 (위의 행 단위 함수와 같은 결과를 배열 단위로 계산)
+AREA_BINS = [50, 100, 200, 500]
+AREA_LABELS = ["매우 작음", "작음", "보통", "큼", "매우 큼"]
+CAPACITY_BINS = [10, 30, 50, 100]
+CAPACITY_LABELS = ["매우 적음", "적음", "보통", "많음", "매우 많음"]
+
+
+def _to_float_array(series):
+    return pd.to_numeric(series, errors="coerce").to_numpy(
+        dtype="float64", na_value=np.nan
+    )
+
+
+def _bin_series(series, bins, labels):
+    """구간 경계(bins) 기준으로 값을 분류 (결측값은 "정보없음")"""
+    values = _to_float_array(series)
+    choices = np.array(labels + ["정보없음"], dtype=object)
+    codes = np.digitize(values, bins)
+    codes[np.isnan(values)] = len(labels)
+    return pd.Series(choices[codes], index=series.index)
+
+
+def _presence_series(series):
+    """보유대수를 "있음"/"없음"으로 분류 (결측값이나 0은 "없음")"""
+    values = _to_float_array(series)
+    present = ~np.isnan(values) & (values != 0)
+    choices = np.array(["없음", "있음"], dtype=object)
+    return pd.Series(choices[present.astype("int8")], index=series.index)
+
+
+def _district_series(addresses):
+    """도로명주소 컬럼에서 자치구를 한 번에 추출"""
+    # "서울특별시 OO구"처럼 주소 앞부분은 종류가 적으므로 고유값에만 패턴을 적용
+    codes, prefixes = pd.factorize(addresses.str.slice(0, 12))
+    found = [_DISTRICT_PATTERN.search(prefix) for prefix in prefixes]
+    labels = np.array([m.group() if m else "기타" for m in found] + ["정보없음"])
+    result = labels.astype(object)[codes]
+
+    # 앞부분에서 찾지 못한 주소만 전체 주소로 다시 확인
+    for i in np.flatnonzero(result == "기타"):
+        result[i] = extract_district(addresses.iat[i])
+
+    return pd.Series(result, index=addresses.index)
+
+
 # 데이터 전처리
 def preprocess_data(df):
     """데이터 전처리"""
-    df["시설면적_분류"] = df["시설면적"].apply(categorize_area)
-    df["이용가능인원_분류"] = df["이용가능인원"].apply(categorize_capacity)
-    df["선풍기_여부"] = df["선풍기보유대수"].apply(has_fan)
-    df["에어컨_여부"] = df["에어컨보유대수"].apply(has_ac)
-    df["자치구"] = df["도로명주소"].apply(extract_district)
+    df["시설면적_분류"] = _bin_series(df["시설면적"], AREA_BINS, AREA_LABELS)
+    df["이용가능인원_분류"] = _bin_series(
+        df["이용가능인원"], CAPACITY_BINS, CAPACITY_LABELS
+    )
+    df["선풍기_여부"] = _presence_series(df["선풍기보유대수"])
+    df["에어컨_여부"] = _presence_series(df["에어컨보유대수"])
+    df["자치구"] = _district_series(df["도로명주소"])
+
+    return df
+
 
+# 공유 데이터셋 캐시
+@dataclass(frozen=True)
+class ShelterDataset:
+    """전처리가 끝난 쉼터 데이터셋 (모든 콜백이 읽기 전용으로 공유)
+
+    만든 뒤에는 바꾸지 않고, 갱신할 때는 새 객체를 만들어 통째로 교체하므로
+    여러 스레드가 잠금 없이 동시에 읽어도 된다. 인덱스 배열들은 쓰기 금지로 둔다.
+    전처리된 DataFrame은 인덱스와 저장소를 만든 뒤 버리고 (갱신할 때는
+    스냅샷에서 다시 읽음), 조회는 store/filter_index/spatial_index로만 한다.
+    """
+
+    spatial_index: SpatialIndex
+    filter_index: FilterIndex
+    shelter_ids: np.ndarray
+    source_path: str
+    checksum: str
+    version: int
+    # 쉼터별 가까운 이웃 그래프와 자치구별 쉼터 수/중심 좌표 (스냅샷에 함께 저장)
+    neighbor_graph: NeighborGraph
+    districts: pd.DataFrame
+    # 조회 경로에서 쓰는 필드의 컬럼별 배열 (행마다 Series를 만들지 않도록)
+    store: ShelterStore
+
+
+_dataset = None
+_dataset_stat = None
+_dataset_lock = threading.Lock()
+# 데이터셋 버전 (프로세스 전체에서 증가만 하므로 버전을 키로 쓰는 캐시가 섞이지 않음)
+_dataset_versions = count(1)
+# 파일 변경 시 백그라운드 갱신 스레드, 갱신에 실패한 파일의 (수정시각, 크기)
+_refresh_thread = None
+_refresh_thread_lock = threading.Lock()
+_refresh_failed_stat = None
+
+
+def _file_stat(path):
+    """파일 변경 감지용 (수정시각, 크기) 반환"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_checksum(path):
+    """파일 내용의 SHA-256 해시 반환"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_preprocessed(path, checksum):
+    """스냅샷이 최신이면 그대로 읽고, 아니면 CSV를 전처리한 뒤 스냅샷을 갱신"""
+    snapshot_path = snapshot_path_for(path)
+    with stage("dataset.load_snapshot"):
+        df = load_snapshot(snapshot_path, checksum)
+    if df is not None:
+        return df
+
+    with stage("dataset.load_csv"):
+        raw = load_data(path)
+    with stage("dataset.preprocess"):
+        df = preprocess_data(raw)
+    try:
+        write_snapshot(df, snapshot_path, checksum)
+    except OSError:
+        pass  # 읽기 전용 환경에서는 스냅샷 없이 계속 진행
     return df
 
 
+def shelter_ids(df):
+    """쉼터 ID ("위치코드:쉼터명칭") 배열 반환 (위치코드만으로는 중복이 있음)"""
+    return (
+        df["위치코드"].astype(str).str.cat(df["쉼터명칭"].astype(str), sep=":")
+    ).to_numpy(dtype=object)
+
+
+def _load_precomputed_geo(path, checksum, df, store, spatial_index, previous=None):
+    """이웃 그래프와 자치구 요약을 스냅샷에서 읽고, 없거나 오래되었으면 계산해 저장
+
+    previous가 (이전 그래프, 좌표가 그대로인 (이전 위치, 새 위치))이면 그래프를
+    처음부터 만들지 않고 바뀐 쉼터 주변만 다시 계산한다.
+    """
+    lats, lons = store.numeric("lat"), store.numeric("lon")
+    snapshot_path = snapshot_path_for(path)
+    with stage("dataset.load_precomputed"):
+        arrays = load_precomputed(snapshot_path, "geo", checksum)
+    if arrays is not None and len(arrays["neighbors"]) == len(df):
+        for array in arrays.values():
+            array.flags.writeable = False
+        return (
+            NeighborGraph.from_arrays(lats, lons, arrays),
+            district_summary_from_arrays(arrays),
+        )
+
+    with stage("dataset.neighbor_graph"):
+        if previous is not None:
+            graph = update_neighbor_graph(*previous[:2], spatial_index, lats, lons)
+        else:
+            graph = build_neighbor_graph(spatial_index, lats, lons)
+    districts = district_summary(df)
+    try:
+        write_precomputed(
+            snapshot_path,
+            "geo",
+            {**graph.to_arrays(), **district_summary_to_arrays(districts)},
+            checksum,
+        )
+    except OSError:
+        pass  # 읽기 전용 환경에서는 저장 없이 계속 진행
+    return graph, districts
+
+
+def _build_dataset(path, checksum, version, df=None, previous=None):
+    if df is None:
+        df = _load_preprocessed(path, checksum)
+    ids = shelter_ids(df)
+    ids.flags.writeable = False
+    store = ShelterStore(df)
+    spatial_index = SpatialIndex(store.numeric("lat"), store.numeric("lon"))
+    graph, districts = _load_precomputed_geo(
+        path, checksum, df, store, spatial_index, previous
+    )
+    return ShelterDataset(
+        spatial_index=spatial_index,
+        filter_index=FilterIndex(df),
+        shelter_ids=ids,
+        source_path=path,
+        checksum=checksum,
+        version=version,
+        neighbor_graph=graph,
+        districts=districts,
+        store=store,
+    )
+
+
+@dataclass(frozen=True)
+class DatasetChanges:
+    """데이터셋 갱신 결과 (변경된 쉼터 ID 목록)"""
+
+    inserted: tuple
+    updated: tuple
+    deleted: tuple
+    version: int
+    full_reload: bool = False
+
+    def __bool__(self):
+        return self.full_reload or bool(self.inserted or self.updated or self.deleted)
+
+
+def _diff_rows(old_df, old_ids, new_df, new_ids):
+    """쉼터 ID 기준으로 원본 컬럼 값을 비교해 행 단위 변경 내역 반환
+
+    반환값은 (추가된 새 위치, 변경된 새 위치, 삭제된 이전 위치,
+    (유지된 이전 위치, 유지된 새 위치))이며, ID가 중복되거나 컬럼 구성이
+    달라 비교할 수 없으면 None이다.
+    """
+    old_index, new_index = pd.Index(old_ids), pd.Index(new_ids)
+    if not (old_index.is_unique and new_index.is_unique):
+        return None
+    if any(
+        column not in old_df.columns or old_df[column].dtype != new_df[column].dtype
+        for column in new_df.columns
+    ):
+        return None
+
+    matches = old_index.get_indexer(new_index)
+    common_new = np.flatnonzero(matches >= 0)
+    common_old = matches[common_new]
+    inserted = np.flatnonzero(matches < 0)
+    deleted = np.setdiff1d(np.arange(len(old_df)), common_old)
+
+    changed = np.zeros(len(common_new), dtype=bool)
+    for column in new_df.columns:
+        old_values = old_df[column].iloc[common_old].reset_index(drop=True)
+        new_values = new_df[column].iloc[common_new].reset_index(drop=True)
+        same = (old_values == new_values).fillna(False).to_numpy(dtype=bool)
+        both_missing = old_values.isna().to_numpy() & new_values.isna().to_numpy()
+        changed |= ~(same | both_missing)
+
+    kept = (common_old[~changed], common_new[~changed])
+    return inserted, common_new[changed], deleted, kept
+
+
+def _apply_changes(old_df, new_raw, inserted, updated, kept):
+    """유지된 행은 이전 전처리 결과를 재사용하고 추가/변경된 행만 전처리해 합침"""
+    kept_old, kept_new = kept
+    parts = [old_df.iloc[kept_old].set_axis(pd.Index(kept_new))]
+
+    fresh = np.sort(np.concatenate([inserted, updated]))
+    if len(fresh):
+        parts.append(preprocess_data(new_raw.iloc[fresh].set_axis(pd.Index(fresh))))
+
+    df = pd.concat(parts).sort_index()
+    return df.set_axis(pd.RangeIndex(len(df)))[old_df.columns]
+
+
+def _same_location(old, df, new_ids, updated, kept):
+    """좌표가 그대로인 쉼터의 (이전 위치, 새 위치) 배열 (유지된 행 + 좌표 외 값만 바뀐 행)"""
+    kept_old, kept_new = kept
+    updated_old = pd.Index(old.shelter_ids).get_indexer(new_ids[updated])
+    same = np.ones(len(updated), dtype=bool)
+    for field, column in (("lat", "위도"), ("lon", "경도")):
+        before = old.store.numeric(field, updated_old)
+        after = pd.to_numeric(df[column].iloc[updated], errors="coerce").to_numpy(
+            dtype="float64", na_value=np.nan
+        )
+        same &= (before == after) | (np.isnan(before) & np.isnan(after))
+    return (
+        np.concatenate([kept_old, updated_old[same]]),
+        np.concatenate([kept_new, updated[same]]),
+    )
+
+
+def _refresh_locked(path, checksum):
+    """(잠금을 잡은 상태에서) 새 파일 내용으로 데이터셋을 갱신하고 변경 내역 반환"""
+    global _dataset
+
+    old = _dataset
+    version = next(_dataset_versions)
+    if old is None or old.source_path != path:
+        _dataset = _build_dataset(path, checksum, version)
+        return DatasetChanges((), (), (), version, full_reload=True)
+
+    new_raw = load_data(path)
+    # 이전 전처리 결과는 스냅샷에서 읽는다 (없으면 전체를 다시 전처리)
+    old_df = load_snapshot(snapshot_path_for(path), old.checksum)
+    diff = None
+    if old_df is not None and len(old_df) == len(old.shelter_ids):
+        diff = _diff_rows(old_df, old.shelter_ids, new_raw, shelter_ids(new_raw))
+    previous = None
+    if diff is None:
+        df = preprocess_data(new_raw)
+        changes = DatasetChanges((), (), (), version, full_reload=True)
+    else:
+        inserted, updated, deleted, kept = diff
+        df = _apply_changes(old_df, new_raw, inserted, updated, kept)
+        new_ids = shelter_ids(df)
+        previous = (old.neighbor_graph, _same_location(old, df, new_ids, updated, kept))
+        changes = DatasetChanges(
+            inserted=tuple(new_ids[inserted]),
+            updated=tuple(new_ids[updated]),
+            deleted=tuple(old.shelter_ids[deleted]),
+            version=version,
+        )
+
+    try:
+        write_snapshot(df, snapshot_path_for(path), checksum)
+    except OSError:
+        pass
+
+    # 기존 데이터셋은 그대로 두고 새 데이터셋으로 교체 (읽는 중인 요청은 영향 없음)
+    _dataset = _build_dataset(path, checksum, version, df, previous)
+    return changes
+
+
+def get_dataset(path=None):
+    """공유 데이터셋 반환
+
+    처음 한 번은 파일을 읽어 데이터셋을 만든다. 이후 수정시각/크기가 바뀌면
+    백그라운드 스레드에서 refresh_dataset으로 바뀐 행만 반영하고, 그동안에는
+    기존 데이터셋을 그대로 반환한다 (요청을 처리하는 스레드에서 갱신하지 않음).
+    반환된 데이터셋은 여러 요청이 공유하므로 배열을 직접 수정하면 안 된다.
+    """
+    global _dataset_stat
+
+    path = path or DATA_PATH
+    dataset = _dataset
+    if dataset is not None and dataset.source_path == path:
+        stat = _file_stat(path)
+        if stat != _dataset_stat and stat != _refresh_failed_stat:
+            _start_background_refresh(path)
+        return dataset
+
+    with _dataset_lock:
+        dataset = _dataset
+        if dataset is None or dataset.source_path != path:
+            stat = _file_stat(path)
+            _refresh_locked(path, file_checksum(path))
+            _dataset_stat = stat
+        return _dataset
+
+
+def _start_background_refresh(path):
+    """refresh_dataset을 백그라운드 스레드로 시작 (이미 진행 중이면 그대로 둠)"""
+    global _refresh_thread
+
+    with _refresh_thread_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return
+        _refresh_thread = threading.Thread(
+            target=_refresh_logged, args=(path,), name="dataset-refresh", daemon=True
+        )
+        _refresh_thread.start()
+
+
+def _refresh_logged(path):
+    global _refresh_failed_stat
+
+    stat = _file_stat(path)
+    try:
+        refresh_dataset(path)
+    except Exception:
+        # 파일이 다시 바뀔 때까지 같은 내용으로 재시도하지 않는다
+        _refresh_failed_stat = stat
+        logger.exception("데이터셋 갱신 실패: %s", path)
+
+
+def refresh_dataset(path=None):
+    """파일을 다시 읽어 쉼터 ID 기준으로 바뀐 행만 반영하고 변경 내역 반환
+
+    유지된 행은 이전 전처리 결과를 재사용하며, 새 데이터셋을 만든 뒤 한 번에
+    교체하므로 갱신 중에도 다른 요청은 기존 데이터셋으로 계속 응답한다.
+    """
+    global _dataset_stat
+
+    path = path or DATA_PATH
+    with _dataset_lock:
+        stat = _file_stat(path)
+        checksum = file_checksum(path)
+        dataset = _dataset
+        if (
+            dataset is not None
+            and dataset.source_path == path
+            and dataset.checksum == checksum
+        ):
+            _dataset_stat = stat
+            return DatasetChanges((), (), (), dataset.version)
+
+        changes = _refresh_locked(path, checksum)
+        _dataset_stat = stat
+        return changes
+
+
+def reload_dataset(path=None):
+    """파일 변경 여부와 관계없이 데이터셋을 강제로 다시 로드"""
+    global _dataset, _dataset_stat
+
+    path = path or DATA_PATH
+    with _dataset_lock:
+        stat = _file_stat(path)
+        version = next(_dataset_versions)
+        _dataset = _build_dataset(path, file_checksum(path), version)
+        _dataset_stat = stat
+        return _dataset
+
+
+# 사용자 위치와 전체 쉼터 간 거리 일괄 계산
+def get_shelter_distances(user_lat, user_lon, dataset=None):
+    """사용자 위치에서 모든 쉼터까지의 거리(km)를 NumPy 배열로 반환
+
+    user_lat/user_lon이 스칼라이면 (쉼터 수,) 배열을, 길이 m인 배열이면
+    (m, 쉼터 수) 배열을 반환한다. 배열 순서는 공유 데이터셋의 행 순서와 같고,
+    좌표가 없는 쉼터의 거리는 NaN이다.
+    """
+    store = (dataset or get_dataset()).store
+    lats, lons = store.numeric("lat"), store.numeric("lon")
+    user_lat = np.asarray(user_lat, dtype="float64")
+    user_lon = np.asarray(user_lon, dtype="float64")
+    if user_lat.ndim:
+        user_lat, user_lon = user_lat[:, np.newaxis], user_lon[:, np.newaxis]
+    return haversine_array(user_lon, user_lat, lons, lats)
+
+
 # 필터링 함수
+def _ensure_list(value):
+    """필터 값을 리스트로 변환 (단일 값인 경우)"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def filter_conditions(
+    facility_type, area_size, capacity_size, has_fan_filter, has_ac_filter, district
+):
+    """필터 인자들을 {컬럼: 선택값 리스트} 형태로 정리"""
+    values = (
+        facility_type,
+        area_size,
+        capacity_size,
+        has_fan_filter,
+        has_ac_filter,
+        district,
+    )
+    return {
+        column: _ensure_list(value) for column, value in zip(FILTER_COLUMNS, values)
+    }
+
+
+def filter_cache_key(conditions):
+    """필터 조건을 캐시 키로 쓸 수 있게 정규화 (선택 순서/중복 무시)"""
+    return tuple(
+        (
+            (ALL_VALUE,)
+            if not values or ALL_VALUE in values
+            else tuple(sorted(set(values)))
+        )
+        for values in conditions.values()
+    )
+
+
 def filter_data(
     df, facility_type, area_size, capacity_size, has_fan_filter, has_ac_filter, district
 ):
     """필터 조건에 따라 데이터 필터링 (멀티 선택 지원)"""
-    filtered_df = df.copy()
+    conditions = filter_conditions(
+        facility_type, area_size, capacity_size, has_fan_filter, has_ac_filter, district
+    )
+
+    # 조건 마스크를 한 번에 합쳐서 적용 (공유 데이터셋은 filter_index.select 사용)
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in conditions.items():
+        if values and ALL_VALUE not in values:
+            mask &= df[column].isin(values).to_numpy()
+    return df[mask]
+
+
+# 쉼터 표시 문자열 (면적/수용인원)
+def _store_measure_display(store, field, unit, positions):
+    """숫자 필드를 "값단위 (분류)" 형식 문자열 리스트로 변환 (결측값은 "정보없음")"""
+    return [
+        f"{text} ({category})"
+        for text, category in zip(
+            store.measure_text(field, unit, positions),
+            store.text(f"{field}_class", positions),
+        )
+    ]
+
+
+def shelter_geojson(store, positions):
+    """저장소의 쉼터들(positions)을 지도 레이어용 GeoJSON 문자열로 변환 (좌표 없는 쉼터 제외)"""
+    positions = np.asarray(positions, dtype="int64")
+    lats, lons = store.numeric("lat", positions), store.numeric("lon", positions)
+    located = ~(np.isnan(lats) | np.isnan(lons))
+    positions, lats, lons = positions[located], lats[located], lons[located]
+
+    properties = {
+        "name": _json_values(store.text("name", positions)),
+        "type": _json_values(store.text("type", positions)),
+        "address": _json_values(store.text("address", positions)),
+        "area": _store_measure_display(store, "area", "㎡", positions),
+        "capacity": _store_measure_display(store, "capacity", "명", positions),
+        "fan": _json_values(store.text("fan", positions)),
+        "ac": _json_values(store.text("ac", positions)),
+        "night": _json_values(store.text("night", positions)),
+        "holiday": _json_values(store.text("holiday", positions)),
+        "stay": _json_values(store.text("stay", positions)),
+    }
+    keys = list(properties)
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": dict(zip(keys, values)),
+        }
+        for lon, lat, *values in zip(lons.tolist(), lats.tolist(), *properties.values())
+    ]
+    return json.dumps(
+        {"type": "FeatureCollection", "features": features},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
 
-    # 각 필터를 리스트로 변환 (단일 값인 경우)
-    def ensure_list(value):
-        if value is None:
-            return []
-        if isinstance(value, list):
-            return value
-        return [value]
 
-    facility_type = ensure_list(facility_type)
-    area_size = ensure_list(area_size)
-    capacity_size = ensure_list(capacity_size)
-    has_fan_filter = ensure_list(has_fan_filter)
-    has_ac_filter = ensure_list(has_ac_filter)
-    district = ensure_list(district)
+def _add_shelter_markers(m, store, positions):
+    """쉼터마다 개별 folium.Marker를 추가 (render_mode="markers")"""
+    lats, lons = store.numeric("lat", positions), store.numeric("lon", positions)
+    located = ~(np.isnan(lats) | np.isnan(lons))
+    positions = np.asarray(positions)[located]
+
+    # 면적/수용인원 (NaN인 경우 "정보없음"으로 표시)
+    areas = store.measure_text("area", "㎡", positions)
+    capacities = store.measure_text("capacity", "명", positions)
+    for shelter, area, capacity in zip(store.records(positions), areas, capacities):
+        popup_text = f"""
+            <b>{shelter.name}</b><br>
+            시설구분: {shelter.type}<br>
+            주소: {shelter.address}<br>
+            면적: {area} ({shelter.area_class})<br>
+            수용인원: {capacity} ({shelter.capacity_class})<br>
+            선풍기: {shelter.fan}<br>
+            에어컨: {shelter.ac}<br>
+            야간운영: {shelter.night}<br>
+            휴일운영: {shelter.holiday}<br>
+            숙박가능: {shelter.stay}
+            """
 
-    # 시설구분2 필터링
-    if facility_type and "전체" not in facility_type:
-        filtered_df = filtered_df[filtered_df["시설구분2"].isin(facility_type)]
+        folium.Marker(
+            [shelter.lat, shelter.lon],
+            popup=folium.Popup(popup_text, max_width=300),
+            tooltip=shelter.name,
+            icon=folium.Icon(color="blue", icon="home"),
+        ).add_to(m)
 
-    # 시설면적 필터링
-    if area_size and "전체" not in area_size:
-        filtered_df = filtered_df[filtered_df["시설면적_분류"].isin(area_size)]
 
-    # 이용가능인원 필터링
-    if capacity_size and "전체" not in capacity_size:
-        filtered_df = filtered_df[filtered_df["이용가능인원_분류"].isin(capacity_size)]
+# 보이는 영역 단위 쉼터 조회 (render_mode="viewport"와 JSON API에서 사용)
+# JSON API의 필터 파라미터 이름 (FILTER_COLUMNS 순서)
+VIEWPORT_FILTER_PARAMS = (
+    "facility_type",
+    "area_size",
+    "capacity_size",
+    "fan",
+    "ac",
+    "district",
+)
+
+
+def _viewport_bounds(lat, lon, zoom, size):
+    """중심 좌표와 확대 수준에서 size(가로, 세로 px) 지도에 보이는 (남, 서, 북, 동)"""
+    width, height = size
+    # 웹 메르카토르: 확대 수준 zoom에서 세계 전체 폭은 256 * 2^zoom px
+    radians_per_px = 2 * np.pi / (256 * 2**zoom)
+    lon_span = np.degrees(radians_per_px * width / 2)
+    y = np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+    south, north = (
+        np.degrees(2 * np.arctan(np.exp(y + sign * radians_per_px * height / 2))) - 90
+        for sign in (-1, 1)
+    )
+    return float(south), float(lon - lon_span), float(north), float(lon + lon_span)
+
+
+def _aggregate_geojson(store, positions, zoom):
+    """쉼터들을 확대 수준에 맞는 격자 칸별로 묶어 (칸 안 쉼터 평균 위치, 쉼터 수) GeoJSON 생성"""
+    cell_deg = 360 / 2**zoom * MAP_CONFIG["viewport_cell_px"] / 256
+    lats, lons = store.numeric("lat", positions), store.numeric("lon", positions)
+    cells = np.column_stack(
+        [np.floor(lats / cell_deg), np.floor(lons / cell_deg)]
+    ).astype("int64")
+    features = []
+    if len(cells):
+        _, inverse = np.unique(cells, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(inverse)
+        cell_lats = np.bincount(inverse, lats) / counts
+        cell_lons = np.bincount(inverse, lons) / counts
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": {"count": count},
+            }
+            for lon, lat, count in zip(
+                cell_lons.tolist(), cell_lats.tolist(), counts.tolist()
+            )
+        ]
+    return json.dumps(
+        {"type": "FeatureCollection", "aggregated": True, "features": features},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
 
-    # 선풍기 필터링
-    if has_fan_filter and "전체" not in has_fan_filter:
-        filtered_df = filtered_df[filtered_df["선풍기_여부"].isin(has_fan_filter)]
 
-    # 에어컨 필터링
-    if has_ac_filter and "전체" not in has_ac_filter:
-        filtered_df = filtered_df[filtered_df["에어컨_여부"].isin(has_ac_filter)]
+def _viewport_geojson(dataset, selected, south, west, north, east, zoom):
+    """경계 상자 안 필터 마스크(selected)에 해당하는 쉼터 GeoJSON 문자열
+
+    확대 수준이 MAP_CONFIG["viewport_detail_zoom"] 이상이고 쉼터 수가
+    viewport_max_features 이하이면 쉼터를 하나씩, 아니면 격자 칸별 쉼터 수로
+    보내므로 응답 크기는 데이터셋 크기와 관계없이 제한된다.
+    """
+    positions = dataset.spatial_index.query_bbox(south, west, north, east, selected)
+    record_rows("viewport.bbox", len(positions))
+    if (
+        zoom >= MAP_CONFIG["viewport_detail_zoom"]
+        and len(positions) <= MAP_CONFIG["viewport_max_features"]
+    ):
+        return shelter_geojson(dataset.store, np.sort(positions))
+    return _aggregate_geojson(dataset.store, positions, zoom)
+
+
+@timed("viewport_geojson")
+def viewport_geojson(
+    south,
+    west,
+    north,
+    east,
+    zoom,
+    facility_type=ALL_VALUE,
+    area_size=ALL_VALUE,
+    capacity_size=ALL_VALUE,
+    has_fan_filter=ALL_VALUE,
+    has_ac_filter=ALL_VALUE,
+    district=ALL_VALUE,
+):
+    """보이는 영역(위도 south~north, 경도 west~east) 안 쉼터 GeoJSON 문자열 반환"""
+    dataset = get_dataset()
+    selected = dataset.filter_index.mask(
+        filter_conditions(
+            facility_type,
+            area_size,
+            capacity_size,
+            has_fan_filter,
+            has_ac_filter,
+            district,
+        )
+    )
+    geojson = _viewport_geojson(dataset, selected, south, west, north, east, zoom)
+    return record_bytes("viewport", geojson)
+
+
+def viewport_query(conditions):
+    """필터 조건을 쉼터 조회 API의 쿼리 문자열로 변환"""
+    return urlencode(
+        [
+            (param, value)
+            for param, values in zip(VIEWPORT_FILTER_PARAMS, conditions.values())
+            for value in values
+        ]
+    )
 
-    # 자치구 필터링
-    if district and "전체" not in district:
-        filtered_df = filtered_df[filtered_df["자치구"].isin(district)]
 
-    return filtered_df
+# 필터 조합별 쉼터 레이어(GeoJSON) 캐시
+_shelter_layer_cache = TTLCache(
+    maxsize=MAP_CONFIG["layer_cache_size"], ttl=MAP_CONFIG["layer_cache_ttl"]
+)
 
 
 # 지도 생성 함수
+@timed("create_map")
 def create_map(
     user_lat,
     user_lon,
@@ -281,80 +941,241 @@ def create_map(
     has_fan_filter,
     has_ac_filter,
     district,
+    render_mode=None,
 ):
-    """지도 생성 및 쉼터 표시"""
-    df = load_data()
-    df = preprocess_data(df)
-
-    # 필터링 적용
-    filtered_df = filter_data(
-        df,
-        facility_type,
-        area_size,
-        capacity_size,
-        has_fan_filter,
-        has_ac_filter,
-        district,
+    """지도 생성 및 쉼터 표시
+
+    render_mode가 "cluster"이면 쉼터를 GeoJSON 클러스터 레이어 하나로,
+    "markers"이면 쉼터마다 개별 마커로 그린다 (기본값은 MAP_CONFIG 설정).
+    """
+    dataset = get_dataset()
+    conditions = filter_conditions(
+        facility_type, area_size, capacity_size, has_fan_filter, has_ac_filter, district
     )
+    return _render_map(dataset, conditions, None, user_lat, user_lon, render_mode)
+
+
+def _render_map(dataset, conditions, selected, user_lat, user_lon, render_mode=None):
+    """필터 조건(conditions)에 맞는 쉼터 지도 HTML 생성
+
+    selected는 conditions에 해당하는 행의 불리언 마스크로, 이미 계산해 둔
+    경우 넘기면 다시 계산하지 않는다 (None이면 필요할 때 계산).
+    """
+    if render_mode is None:
+        render_mode = MAP_CONFIG["render_mode"]
+
+    def filtered_positions():
+        with stage("map.filter"):
+            if selected is None:
+                positions = dataset.filter_index.select(conditions)
+            else:
+                positions = np.flatnonzero(selected)
+        record_rows("map.filter", len(positions))
+        return positions
 
-    # 지도 생성 (서울 중심)
+    # 지도 생성 (위치가 없으면 선택한 자치구 하나의 중심, 그 외에는 서울 중심)
+    districts = conditions.get("자치구", [])
     if user_lat and user_lon:
         center_lat, center_lon = user_lat, user_lon
+    elif len(districts) == 1 and districts[0] in dataset.districts.index:
+        center_lat, center_lon = dataset.districts.loc[districts[0], ["lat", "lon"]]
     else:
         center_lat, center_lon = 37.5665, 126.9780  # 서울시청
 
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
+    with stage("map.folium"):
+        m = folium.Map(
+            location=[center_lat, center_lon], zoom_start=MAP_CONFIG["zoom_start"]
+        )
 
-    # 사용자 위치 표시
-    if user_lat and user_lon:
-        folium.Marker(
-            [user_lat, user_lon],
-            popup="내 위치",
-            tooltip="내 위치",
-            icon=folium.Icon(color="red", icon="user"),
-        ).add_to(m)
+        # 사용자 위치 표시
+        if user_lat and user_lon:
+            folium.Marker(
+                [user_lat, user_lon],
+                popup="내 위치",
+                tooltip="내 위치",
+                icon=folium.Icon(color="red", icon="user"),
+            ).add_to(m)
 
-    # 쉼터 마커 추가
-    for idx, row in filtered_df.iterrows():
-        if pd.notna(row["위도"]) and pd.notna(row["경도"]):
-            # 면적 정보 처리 (NaN인 경우 "정보없음"으로 표시)
-            area_info = row["시설면적"]
-            if pd.isna(area_info):
-                area_display = f"정보없음 ({row['시설면적_분류']})"
-            else:
-                area_display = f"{area_info}㎡ ({row['시설면적_분류']})"
+    # 보이는 영역의 쉼터만 싣고 나머지는 지도를 움직일 때 API로 받음
+    if render_mode == "viewport":
+        zoom = MAP_CONFIG["zoom_start"]
+        south, west, north, east = _viewport_bounds(
+            center_lat, center_lon, zoom, MAP_CONFIG["viewport_size"]
+        )
+        if selected is None:
+            selected = dataset.filter_index.mask(conditions)
+        with stage("map.viewport"):
+            geojson = _viewport_geojson(
+                dataset, selected, south, west, north, east, zoom
+            )
+        layer = ShelterViewportLayer(
+            geojson, MAP_CONFIG["viewport_url"], viewport_query(conditions)
+        )
+        layer.add_to(m)
+        with stage("map.serialize"):
+            html = layer.fill(m._repr_html_())
+        return record_bytes("map", html)
 
-            # 수용인원 정보 처리 (NaN인 경우 "정보없음"으로 표시)
-            capacity_info = row["이용가능인원"]
-            if pd.isna(capacity_info):
-                capacity_display = f"정보없음 ({row['이용가능인원_분류']})"
-            else:
-                capacity_display = f"{capacity_info}명 ({row['이용가능인원_분류']})"
-
-            popup_text = f"""
-            <b>{row['쉼터명칭']}</b><br>
-            시설구분: {row['시설구분2']}<br>
-            주소: {row['도로명주소']}<br>
-            면적: {area_display}<br>
-            수용인원: {capacity_display}<br>
-            선풍기: {row['선풍기_여부']}<br>
-            에어컨: {row['에어컨_여부']}<br>
-            야간운영: {row['야간운영여부']}<br>
-            휴일운영: {row['휴일운영여부']}<br>
-            숙박가능: {row['숙박가능여부']}
-            """
+    # 쉼터 표시 (클러스터 레이어는 필터 조합별로 캐시해 두고 재사용)
+    if render_mode == "cluster":
 
-            folium.Marker(
-                [row["위도"], row["경도"]],
-                popup=folium.Popup(popup_text, max_width=300),
-                tooltip=row["쉼터명칭"],
-                icon=folium.Icon(color="blue", icon="home"),
-            ).add_to(m)
+        def build_geojson():
+            positions = filtered_positions()
+            with stage("map.geojson"):
+                return shelter_geojson(dataset.store, positions)
+
+        geojson = _shelter_layer_cache.get_or_set(
+            (dataset.version, filter_cache_key(conditions)), build_geojson
+        )
+        layer = ShelterClusterLayer(geojson)
+        layer.add_to(m)
+        with stage("map.serialize"):
+            html = layer.fill(m._repr_html_())
+        return record_bytes("map", html)
 
-    return m._repr_html_()
+    positions = filtered_positions()
+    with stage("map.markers"):
+        _add_shelter_markers(m, dataset.store, positions)
+
+    with stage("map.serialize"):
+        html = m._repr_html_()
+    return record_bytes("map", html)
+
+
+# 실시간 운영 정보 (온도/사용자 수)
+_telemetry_slots = (None, None)
+
+
+def live_status(dataset, positions=None):
+    """쉼터별 (현재 온도, 현재 사용자 수) float 배열 반환
+
+    TelemetryStore에 들어온 실시간 값을 우선 사용하고, 값이 없는 쉼터는
+    CSV의 current_temperature/current_occupancy 값을 사용한다 (둘 다 없으면 NaN).
+    positions를 주면 해당 행들의 값만 반환한다.
+    """
+    global _telemetry_slots
+
+    if positions is None:
+        positions = np.arange(len(dataset.store))
+    temperature = dataset.store.numeric("temperature", positions)
+    occupancy = dataset.store.numeric("occupancy", positions)
+
+    store = get_telemetry_store()
+    if len(store) == 0:
+        return temperature, occupancy
+
+    # 쉼터 ID → slot 대응은 데이터셋이 바뀌거나 저장소의 slot 배정이 바뀌었을 때만
+    # 다시 계산 (clear 후 같은 수의 ID가 다른 순서로 들어와도 다시 계산됨)
+    key = (dataset.version, store.generation)
+    cached_key, slots = _telemetry_slots
+    if cached_key != key:
+        slots = store.slots_for(dataset.shelter_ids)
+        _telemetry_slots = (key, slots)
+
+    live_temperature, live_occupancy = store.lookup(slots[positions])
+    temperature = np.where(np.isnan(live_temperature), temperature, live_temperature)
+    occupancy = np.where(np.isnan(live_occupancy), occupancy, live_occupancy)
+    return temperature, occupancy
+
+
+def known_shelter_ids(ids, dataset=None):
+    """쉼터 ID 목록 각각이 데이터셋에 있는지 여부 (bool 배열)"""
+    dataset = dataset or get_dataset()
+    return pd.Index(ids, dtype=object).isin(dataset.shelter_ids)
+
+
+def _format_number(value):
+    """정수로 떨어지는 값은 소수점 없이 표시"""
+    return int(value) if float(value).is_integer() else value
+
+
+# 주변 쉼터 검색
+def search_nearby(
+    dataset,
+    selected,
+    user_lat,
+    user_lon,
+    radius_km=None,
+    limit=None,
+    max_radius_km=None,
+    conditions=None,
+):
+    """필터 마스크(selected)에 해당하는 가까운 쉼터를 거리순으로 최대 limit개 반환
+
+    limit을 주지 않으면 NEARBY_CONFIG["limit"]개까지 반환한다. 반경 radius_km
+    안에 쉼터가 없으면 max_radius_km까지 반경을 두 배씩 넓힌다.
+    반환값은 (행 위치 배열, 거리(km) 배열, 반경 내 전체 개수, 실제 검색 반경)이다.
+    selected를 만든 필터 조건(conditions)을 주면 geohash 칸별 결과 캐시를 쓴다.
+    """
+    if radius_km is None:
+        radius_km = NEARBY_CONFIG["radius_km"]
+    if max_radius_km is None:
+        max_radius_km = NEARBY_CONFIG["max_radius_km"]
+    k = NEARBY_CONFIG["limit"] if limit is None else limit
+
+    if conditions is not None and RESULT_CACHE_CONFIG["enabled"]:
+        result = _cached_nearby(
+            dataset, selected, conditions, user_lat, user_lon, radius_km, k
+        )
+        if result is not None:
+            return result
+
+    while True:
+        positions, distances, total = dataset.spatial_index.nearest_within(
+            user_lat, user_lon, radius_km, k, selected
+        )
+        if total or radius_km >= max_radius_km:
+            return positions, distances, total, radius_km
+        radius_km = min(radius_km * 2, max_radius_km)
+
+
+# geohash 칸별 후보 쉼터 캐시 (GPS 오차로 조금씩 다른 위치의 반복 조회 재사용)
+_result_cache = TTLCache(
+    maxsize=RESULT_CACHE_CONFIG["maxsize"], ttl=RESULT_CACHE_CONFIG["ttl"]
+)
+
+# 부동소수점 오차로 후보가 빠지지 않도록 후보 반경에 두는 여유 (km)
+_CACHE_MARGIN_KM = 1e-6
+
+
+def _cache_cell(user_lat, user_lon):
+    return geohash_cell(user_lat, user_lon, RESULT_CACHE_CONFIG["geohash_precision"])
+
+
+def _frozen(positions):
+    positions.flags.writeable = False
+    return positions
+
+
+def _cached_nearby(dataset, selected, conditions, user_lat, user_lon, radius_km, k):
+    """캐시한 칸별 후보로 search_nearby의 첫 반경 검색 (반경 안에 없으면 None)
+
+    후보는 칸 중심에서 radius_km + 칸 외접원 반지름 이내 쉼터라 칸 안 어느
+    위치에서든 반경 이내 쉼터를 모두 포함하고, 거리는 실제 위치로 다시 계산한다.
+    """
+    cell, center_lat, center_lon, cell_radius_km = _cache_cell(user_lat, user_lon)
+    candidates = _result_cache.get_or_set(
+        ("nearby", dataset.version, cell, filter_cache_key(conditions), radius_km),
+        lambda: _frozen(
+            dataset.spatial_index.query_radius(
+                center_lat,
+                center_lon,
+                radius_km + cell_radius_km + _CACHE_MARGIN_KM,
+                selected,
+            )[0]
+        ),
+    )
+    distances = dataset.spatial_index.distances(user_lat, user_lon, candidates)
+    within = distances <= radius_km
+    positions, distances = candidates[within], distances[within]
+    if not len(positions):
+        return None
+    order = np.lexsort((positions, distances))[:k]
+    return positions[order], distances[order], len(positions), radius_km
 
 
 # 주변 쉼터 카드 생성
+@timed("get_nearby_shelters")
 def get_nearby_shelters(
     user_lat,
     user_lon,
@@ -364,160 +1185,174 @@ def get_nearby_shelters(
     has_fan_filter,
     has_ac_filter,
     district,
+    limit=None,
+    offset=0,
+    radius_km=None,
 ):
-    """주변 1km 내 쉼터 목록 반환"""
+    """주변 쉼터 목록 반환 (limit/offset으로 일부만 표시, 기본 최대 NEARBY_CONFIG["limit"]개)"""
     if not user_lat or not user_lon:
         return "위치 정보를 입력해주세요."
 
-    df = load_data()
-    df = preprocess_data(df)
+    dataset = get_dataset()
+    conditions = filter_conditions(
+        facility_type, area_size, capacity_size, has_fan_filter, has_ac_filter, district
+    )
+    selected = dataset.filter_index.mask(conditions)
+    return _render_nearby(
+        dataset, selected, user_lat, user_lon, limit, offset, radius_km, conditions
+    )
 
-    # 필터링 적용
-    filtered_df = filter_data(
-        df,
-        facility_type,
-        area_size,
-        capacity_size,
-        has_fan_filter,
-        has_ac_filter,
-        district,
+
+def _format_km(value):
+    return f"{_format_number(value)}km"
+
+
+def _render_nearby(
+    dataset,
+    selected,
+    user_lat,
+    user_lon,
+    limit=None,
+    offset=0,
+    radius_km=None,
+    conditions=None,
+):
+    """필터 마스크(selected)에 해당하는 주변 쉼터 카드 HTML 생성
+
+    거리순으로 offset번째부터 최대 limit개(기본 NEARBY_CONFIG["limit"]개)만
+    카드로 만든다.
+    """
+    if radius_km is None:
+        radius_km = NEARBY_CONFIG["radius_km"]
+    if limit is None:
+        limit = NEARBY_CONFIG["limit"]
+    # 화면에 보일 쉼터(offset + limit개)까지만 골라 정렬
+    with stage("nearby.search"):
+        positions, distances, total, searched_km = search_nearby(
+            dataset,
+            selected,
+            user_lat,
+            user_lon,
+            radius_km,
+            offset + limit,
+            conditions=conditions,
+        )
+    record_rows("nearby.search", total)
+
+    if total == 0:
+        return f"주변 {_format_km(searched_km)} 내에 조건에 맞는 쉼터가 없습니다."
+
+    notice = None
+    if searched_km > radius_km:
+        notice = (
+            f"반경 {_format_km(radius_km)} 내에 쉼터가 없어 "
+            f"{_format_km(searched_km)} 이내 쉼터를 표시합니다."
+        )
+
+    positions, distances = positions[offset:], distances[offset:]
+    store = dataset.store
+
+    # 운영 상태 판단 (온도 30도 이상이고 사용자 수 0이면 미운영)
+    temps, occupancies = live_status(dataset, positions)
+    operating = ~((temps >= 30) & (occupancies == 0))
+
+    columns = {
+        "name": store.text("name", positions),
+        "type": store.text("type", positions),
+        "address": store.text("address", positions),
+        # 면적/수용인원 (NaN인 경우 "정보없음"으로 표시)
+        "area": _store_measure_display(store, "area", "㎡", positions),
+        "capacity": _store_measure_display(store, "capacity", "명", positions),
+        "fan": store.text("fan", positions),
+        "ac": store.text("ac", positions),
+        # 실시간 온도/사용자 수 (NaN인 경우 "정보없음"으로 표시)
+        "temperature": [
+            "정보없음" if np.isnan(t) else f"{_format_number(t)}°C" for t in temps
+        ],
+        "occupancy": [
+            "정보없음" if np.isnan(o) else f"{_format_number(o)}명" for o in occupancies
+        ],
+        "operating": operating,
+        "distance": [round(d, 2) for d in distances.tolist()],
+        "lat": store.numeric("lat", positions).tolist(),
+        "lon": store.numeric("lon", positions).tolist(),
+    }
+    with stage("nearby.cards"):
+        html = render_cards(
+            columns,
+            user_lat,
+            user_lon,
+            total=total,
+            offset=offset,
+            notice=notice,
+        )
+    return record_bytes("nearby", html)
+
+
+# 지도와 주변 쉼터 목록을 한 번에 생성
+@timed("query_shelters")
+def query_shelters(
+    user_lat,
+    user_lon,
+    facility_type,
+    area_size,
+    capacity_size,
+    has_fan_filter,
+    has_ac_filter,
+    district,
+    render_mode=None,
+    limit=None,
+    offset=0,
+    radius_km=None,
+):
+    """지도 HTML과 주변 쉼터 카드 HTML을 함께 반환
+
+    create_map과 get_nearby_shelters를 차례로 부르는 것과 결과는 같지만,
+    데이터셋 조회와 필터 계산을 한 번만 수행한다.
+    """
+    dataset = get_dataset()
+    conditions = filter_conditions(
+        facility_type, area_size, capacity_size, has_fan_filter, has_ac_filter, district
     )
+    selected = dataset.filter_index.mask(conditions)
 
-    # 거리 계산 및 1km 이내 필터링
-    nearby_shelters = []
-    for idx, row in filtered_df.iterrows():
-        if pd.notna(row["위도"]) and pd.notna(row["경도"]):
-            distance = haversine(user_lon, user_lat, row["경도"], row["위도"])
-            if distance <= 1.0:  # 1km 이내
-                # 면적 정보 처리 (NaN인 경우 "정보없음"으로 표시)
-                area_info = row["시설면적"]
-                if pd.isna(area_info):
-                    area_display = f"정보없음 ({row['시설면적_분류']})"
-                else:
-                    area_display = f"{area_info}㎡ ({row['시설면적_분류']})"
-
-                # 수용인원 정보 처리 (NaN인 경우 "정보없음"으로 표시)
-                capacity_info = row["이용가능인원"]
-                if pd.isna(capacity_info):
-                    capacity_display = f"정보없음 ({row['이용가능인원_분류']})"
-                else:
-                    capacity_display = f"{capacity_info}명 ({row['이용가능인원_분류']})"
-
-                # 실시간 온도 및 사용자 수 처리
-                current_temp = row.get("current_temperature")
-                current_occupancy = row.get("current_occupancy")
-
-                # 온도 정보 처리 (NaN인 경우 "정보없음"으로 표시)
-                if pd.isna(current_temp):
-                    temp_display = "정보없음"
-                else:
-                    temp_display = f"{current_temp}°C"
-
-                    # 사용자 수 정보 처리 (NaN인 경우 "정보없음"으로 표시)
-                if pd.isna(current_occupancy):
-                    occupancy_display = "정보없음"
-                else:
-                    occupancy_display = f"{current_occupancy}명"
-
-                # 운영 상태 판단 (온도 30도 이상이고 사용자 수 0이면 미운영)
-                is_operating = True
-                if not pd.isna(current_temp) and not pd.isna(current_occupancy):
-                    if current_temp >= 30 and current_occupancy == 0:
-                        is_operating = False
-
-                nearby_shelters.append(
-                    {
-                        "name": row["쉼터명칭"],
-                        "type": row["시설구분2"],
-                        "address": row["도로명주소"],
-                        "area": area_display,
-                        "capacity": capacity_display,
-                        "fan": row["선풍기_여부"],
-                        "ac": row["에어컨_여부"],
-                        "current_temp": temp_display,
-                        "current_occupancy": occupancy_display,
-                        "is_operating": is_operating,
-                        "distance": round(distance, 2),
-                        "lat": row["위도"],
-                        "lon": row["경도"],
-                    }
-                )
-
-    # 거리순 정렬
-    nearby_shelters.sort(key=lambda x: x["distance"])
-
-    if not nearby_shelters:
-        return "주변 1km 내에 조건에 맞는 쉼터가 없습니다."
-
-    # HTML 카드 형태로 생성
-    cards_html = "<div style='max-height: 809px; overflow-y: auto;'>"
-    for shelter in nearby_shelters:
-        # 카카오지도 길찾기 링크 생성
-        kakao_directions_url = f"https://map.kakao.com/link/from/현재위치,{user_lat},{user_lon}/to/{shelter['name']},{shelter['lat']},{shelter['lon']}"
-
-        # 운영 상태에 따른 배경색 설정
-        if shelter["is_operating"]:
-            bg_color = "#d4edda"  # 밝은 초록색 (운영 중)
-            border_color = "#28a745"
-            status_text = "<div style='background-color: #28a745; color: white; padding: 5px 10px; border-radius: 4px; margin-bottom: 10px; text-align: center; font-weight: bold;'>✅ 운영 중</div>"
-        else:
-            bg_color = "#f8d7da"  # 밝은 빨간색 (미운영)
-            border_color = "#dc3545"
-            status_text = "<div style='background-color: #dc3545; color: white; padding: 5px 10px; border-radius: 4px; margin-bottom: 10px; text-align: center; font-weight: bold;'>🚫 미운영 중</div>"
-
-        cards_html += f"""
-        <div style='border: 3px solid {border_color}; margin: 10px; padding: 15px; border-radius: 8px; background-color: {bg_color}; box-shadow: 0 4px 8px rgba(0,0,0,0.1);'>
-            <h3 style='margin-top: 0; color: #2c3e50;'>{shelter['name']}</h3>
-            {status_text}
-            <p><strong>거리:</strong> {shelter['distance']}km</p>
-            <p><strong>시설구분:</strong> {shelter['type']}</p>
-            <p><strong>주소:</strong> {shelter['address']}</p>
-            <p><strong>면적:</strong> {shelter['area']}</p>
-            <p><strong>수용인원:</strong> {shelter['capacity']}</p>
-            <p><strong>편의시설:</strong> 선풍기 {shelter['fan']}, 에어컨 {shelter['ac']}</p>
-            <h3 style='margin-top: 15px; margin-bottom: 10px; color: #e74c3c; font-size: 16px;'>실시간 운영 정보</h3>
-            <p><strong>현재 온도:</strong> {shelter['current_temp']}</p>
-            <p><strong>현재 사용자 수:</strong> {shelter['current_occupancy']}</p>
-            <div style='margin-top: 10px; text-align: center;'>
-                <a href="{kakao_directions_url}" target="_blank" 
-                   style='display: inline-block; padding: 8px 16px; background-color: #FEE500; color: #3C1E1E; 
-                          text-decoration: none; border-radius: 4px; font-weight: bold; font-size: 14px;'>
-                    🗺️ 카카오지도 길찾기
-                </a>
-            </div>
-        </div>
-        """
-    cards_html += "</div>"
-
-    return cards_html
+    map_html = _render_map(
+        dataset, conditions, selected, user_lat, user_lon, render_mode
+    )
+    if not user_lat or not user_lon:
+        return map_html, "위치 정보를 입력해주세요."
+    return map_html, _render_nearby(
+        dataset, selected, user_lat, user_lon, limit, offset, radius_km, conditions
+    )
 
 
 # 위치 기반 자치구 추정 함수
+@timed("get_district_from_location")
 def get_district_from_location(user_lat, user_lon):
     """사용자 위치 기반으로 자치구 추정"""
     if not user_lat or not user_lon:
         return "중구"  # 기본값
 
-    df = load_data()
-    df = preprocess_data(df)
+    # 자치구 경계 폴리곤으로 먼저 확인
+    resolver = get_district_resolver()
+    if resolver is not None:
+        with stage("district.polygon"):
+            district = resolver.resolve(user_lat, user_lon)
+        if district is not None:
+            return district
 
-    # 좌표가 있는 쉼터들만 필터링
-    valid_shelters = df.dropna(subset=["위도", "경도"])
+    # 경계 파일이 없거나 경계 밖이면 가까운 쉼터들의 자치구로 추정
+    dataset = get_dataset()
 
-    if valid_shelters.empty:
+    if len(dataset.spatial_index) == 0:
         return "중구"
 
-    # 모든 쉼터와의 거리 계산
-    distances = []
-    for idx, row in valid_shelters.iterrows():
-        distance = haversine(user_lon, user_lat, row["경도"], row["위도"])
-        distances.append({"distance": distance, "district": row["자치구"]})
-
-    # 거리순 정렬
-    distances.sort(key=lambda x: x["distance"])
-
     # 가장 가까운 5개 쉼터의 자치구 중 가장 많이 나오는 자치구 선택
-    top_5_districts = [d["district"] for d in distances[:5] if d["district"] != "기타"]
+    with stage("district.knn"):
+        positions, _ = nearest_shelters(dataset, user_lat, user_lon, 5)
+    top_5_districts = [
+        d for d in dataset.store.text("district", positions) if d != "기타"
+    ]
 
     if top_5_districts:
         # 가장 많이 나오는 자치구 찾기
@@ -530,98 +1365,370 @@ def get_district_from_location(user_lat, user_lon):
     return "중구"  # 기본값
 
 
-# 나이와 이름 기반 적합한 쉼터 추천 함수
-def get_recommended_shelter(user_lat, user_lon, user_age, user_name):
-    """나이와 이름을 기반으로 가장 적합한 쉼터 추천"""
-    if not user_lat or not user_lon:
-        return "위치 정보를 입력해주세요.", None, None, None
+# 추천 대상 판단 (배열 단위)
+MEMBER_FACILITY_KEYWORD = "회원이용시설"  # 경로당 등 회원만 이용 가능한 시설
+MEMBER_FACILITY_MIN_AGE = 60  # 이 나이를 넘어야 회원이용시설도 추천
 
-    if not user_age or not user_name:
-        return "나이와 이름을 입력해주세요.", None, None, None
 
-    try:
-        user_age = int(user_age)
-    except ValueError:
-        return "올바른 나이를 입력해주세요.", None, None, None
+def _operating_mask(dataset):
+    """운영 중인 쉼터 마스크 (온도 30도 이상이고 사용자 수 0이면 미운영)"""
+    temp, occupancy = live_status(dataset)
+    return ~((temp >= 30) & (occupancy == 0))
 
-    df = load_data()
-    df = preprocess_data(df)
 
-    # 운영 중인 쉼터만 필터링 (온도 30도 이상이고 사용자 수 0이면 제외)
-    operating_shelters = []
-    for idx, row in df.iterrows():
-        if pd.notna(row["위도"]) and pd.notna(row["경도"]):
-            current_temp = row.get("current_temperature")
-            current_occupancy = row.get("current_occupancy")
+def _age_eligible_mask(dataset, user_age):
+    """나이 기준 이용 가능 쉼터 마스크 (60대 이하는 회원이용시설 제외)"""
+    if user_age > MEMBER_FACILITY_MIN_AGE:
+        return np.ones(len(dataset.store), dtype=bool)
 
-            # 운영 상태 판단
-            is_operating = True
-            if not pd.isna(current_temp) and not pd.isna(current_occupancy):
-                if current_temp >= 30 and current_occupancy == 0:
-                    is_operating = False
+    member_types = [
+        value
+        for value in dataset.filter_index.categories["시설구분2"]
+        if MEMBER_FACILITY_KEYWORD in value
+    ]
+    if not member_types:
+        return np.ones(len(dataset.store), dtype=bool)
+    return ~dataset.filter_index.mask({"시설구분2": member_types})
 
-            if is_operating:
-                distance = haversine(user_lon, user_lat, row["경도"], row["위도"])
-                operating_shelters.append({"row": row, "distance": distance})
 
-    if not operating_shelters:
-        return "주변에 적합한 쉼터가 없습니다.", None, None, None
+def nearest_shelters(dataset, user_lat, user_lon, k, mask=None):
+    """가장 가까운 k개 쉼터(mask가 있으면 mask가 True인 쉼터만)의 (위치, 거리) 반환
 
-    # 거리순 정렬
-    operating_shelters.sort(key=lambda x: x["distance"])
+    가장 가까운 쉼터의 이웃 그래프로 답이 보장되면 그것을 쓰고, 아니면
+    mask가 없을 때는 격자 k-최근접 검색, 있을 때는 None을 반환한다.
+    """
+    seed, seed_distance = dataset.spatial_index.query_knn(user_lat, user_lon, 1)
+    if len(seed):
+        result = dataset.neighbor_graph.nearest(
+            user_lat, user_lon, k, seed[0], seed_distance[0], mask
+        )
+        if result is not None:
+            return result
+    if mask is None:
+        return dataset.spatial_index.query_knn(user_lat, user_lon, k)
+    return None
+
+
+def rank_shelters(user_lat, user_lon, user_age, top_n=1, dataset=None):
+    """운영 중이고 나이 기준에 맞는 쉼터를 가까운 순으로 최대 top_n개 반환
+
+    반환값은 (데이터셋 행 위치 배열, 거리(km) 배열)이다.
+    """
+    dataset = dataset or get_dataset()
+    if RESULT_CACHE_CONFIG["enabled"] and top_n > 0:
+        # 같은 geohash 칸의 후보 중에서 실제 위치 기준 거리로 다시 순위를 매김
+        cell = _cache_cell(user_lat, user_lon)
+        candidates = _result_cache.get_or_set(
+            (
+                "recommend",
+                dataset.version,
+                get_telemetry_store().version,
+                cell[0],
+                user_age > MEMBER_FACILITY_MIN_AGE,
+                top_n,
+            ),
+            lambda: _recommend_candidates(dataset, cell, user_age, top_n),
+        )
+        distances = dataset.spatial_index.distances(user_lat, user_lon, candidates)
+        order = np.lexsort((candidates, distances))[:top_n]
+        return candidates[order], distances[order]
 
-    # 나이 기반 필터링
-    filtered_shelters = []
-    for shelter in operating_shelters:
-        row = shelter["row"]
-        facility_type = row["시설구분2"]
+    eligible = _operating_mask(dataset) & _age_eligible_mask(dataset, user_age)
+    return _rank_eligible(dataset, user_lat, user_lon, eligible, top_n)
 
-        # 60대 이하인 경우 회원이용시설(경로당) 제외
-        if user_age <= 60 and "회원이용시설" in facility_type:
-            continue
 
-        filtered_shelters.append(shelter)
+def _recommend_candidates(dataset, cell, user_age, top_n):
+    """geohash 칸 안 어느 위치에서든 추천 top_n개를 모두 포함하는 후보 쉼터 위치
 
-    if not filtered_shelters:
-        return "주변에 적합한 쉼터가 없습니다.", None, None, None
+    칸 중심의 top_n번째 거리를 d, 칸 외접원 반지름을 h라 하면 칸 안 위치의
+    top_n개는 모두 칸 중심에서 d + 2h 이내에 있다 (삼각 부등식).
+    """
+    _, center_lat, center_lon, cell_radius_km = cell
+    eligible = _operating_mask(dataset) & _age_eligible_mask(dataset, user_age)
+    positions, distances = _rank_eligible(
+        dataset, center_lat, center_lon, eligible, top_n
+    )
+    if len(positions) < top_n:
+        return _frozen(positions)  # 조건에 맞는 쉼터가 top_n개보다 적으면 전부
+    candidates, _ = dataset.spatial_index.query_radius(
+        center_lat,
+        center_lon,
+        distances[-1] + 2 * cell_radius_km + _CACHE_MARGIN_KM,
+        eligible,
+    )
+    return _frozen(candidates)
 
-    # 가장 가까운 적합한 쉼터 선택
-    best_shelter = filtered_shelters[0]
-    row = best_shelter["row"]
-    distance = best_shelter["distance"]
 
-    # 면적 정보 처리
-    area_info = row["시설면적"]
-    if pd.isna(area_info):
-        area_display = f"정보없음 ({row['시설면적_분류']})"
-    else:
-        area_display = f"{area_info}㎡ ({row['시설면적_분류']})"
+def _rank_eligible(dataset, user_lat, user_lon, eligible, top_n):
+    """eligible 마스크에 해당하는 쉼터를 가까운 순으로 최대 top_n개 반환"""
+    # 가까운 쉼터의 이웃 목록으로 보장되는 경우 전체 거리 계산 생략
+    if top_n > 0:
+        result = nearest_shelters(dataset, user_lat, user_lon, top_n, eligible)
+        if result is not None:
+            return result
+
+    distances = get_shelter_distances(user_lat, user_lon, dataset)
+    eligible = eligible & ~np.isnan(distances)
+    positions = np.flatnonzero(eligible)
+    distances = distances[positions]
+
+    # 전체를 정렬하지 않고 top_n번째 거리 이하인 후보만 남긴 뒤 정렬
+    if len(positions) > top_n > 0:
+        kth = np.partition(distances, top_n - 1)[top_n - 1]
+        within = distances <= kth
+        positions, distances = positions[within], distances[within]
+    order = np.lexsort((positions, distances))[:top_n]
+    return positions[order], distances[order]
 
-    # 수용인원 정보 처리
-    capacity_info = row["이용가능인원"]
-    if pd.isna(capacity_info):
-        capacity_display = f"정보없음 ({row['이용가능인원_분류']})"
+
+def rank_shelters_batch(
+    user_lats, user_lons, user_ages, top_n=1, dataset=None, workers=None
+):
+    """여러 위치 각각에 대해 rank_shelters와 같은 기준으로 가까운 쉼터 top_n개 반환
+
+    위치를 BATCH_CONFIG["chunk_size"]개씩 (행렬 칸 수가 max_matrix_cells를 넘지
+    않도록) 나눠 거리 행렬 단위로 계산하며,
+    workers가 2 이상이면 조각들을 여러 프로세스에서 나눠 계산한다.
+    반환값은 (위치 수, top_n) 모양의 (행 위치 배열, 거리(km) 배열)이며,
+    후보가 부족한 칸은 위치 -1, 거리 NaN이다.
+    """
+    dataset = dataset or get_dataset()
+    lats = dataset.store.numeric("lat")
+    lons = dataset.store.numeric("lon")
+    user_lats = np.asarray(user_lats, dtype="float64").reshape(-1)
+    user_lons = np.asarray(user_lons, dtype="float64").reshape(-1)
+    user_ages = np.broadcast_to(np.asarray(user_ages), user_lats.shape)
+
+    # 그룹 0: 회원이용시설 제외, 그룹 1: 전체 (운영 중인 쉼터만)
+    operating = _operating_mask(dataset)
+    masks = np.vstack(
+        [
+            operating & _age_eligible_mask(dataset, 0),
+            operating & _age_eligible_mask(dataset, MEMBER_FACILITY_MIN_AGE + 1),
+        ]
+    )
+    groups = (user_ages > MEMBER_FACILITY_MIN_AGE).astype("int64")
+
+    # 조각마다 (위치 수 x 쉼터 수) 행렬을 만들므로 칸 수가 상한을 넘지 않게 나눈다
+    chunk_size = max(
+        1,
+        min(
+            BATCH_CONFIG["chunk_size"],
+            BATCH_CONFIG["max_matrix_cells"] // max(len(lats), 1),
+        ),
+    )
+    starts = range(0, len(user_lats), chunk_size)
+    chunks = (
+        [user_lats[i : i + chunk_size] for i in starts],
+        [user_lons[i : i + chunk_size] for i in starts],
+        repeat(lats),
+        repeat(lons),
+        repeat(top_n),
+        repeat(masks),
+        [groups[i : i + chunk_size] for i in starts],
+    )
+    if workers is None:
+        workers = BATCH_CONFIG["workers"]
+    if workers > 1 and len(starts) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(nearest_batch, *chunks))
     else:
-        capacity_display = f"{capacity_info}명 ({row['이용가능인원_분류']})"
+        results = list(map(nearest_batch, *chunks))
+
+    if not results:
+        return np.empty((0, top_n), dtype="int64"), np.empty((0, top_n))
+    positions, distances = zip(*results)
+    return np.vstack(positions), np.vstack(distances)
+
+
+def get_recommended_shelters(user_lat, user_lon, user_age, top_n=3):
+    """나이 기준에 맞는 가까운 운영 중 쉼터 top_n개를 추천 순서대로 반환"""
+    dataset = get_dataset()
+    positions, distances = rank_shelters(
+        user_lat, user_lon, int(user_age), top_n, dataset
+    )
+    current_temps, current_occupancies = live_status(dataset, positions)
+
+    recommendations = []
+    for shelter, distance, temp, occupancy in zip(
+        dataset.store.records(positions),
+        distances.tolist(),
+        current_temps.tolist(),
+        current_occupancies.tolist(),
+    ):
+        recommendations.append(
+            {
+                "name": shelter.name,
+                "type": shelter.type,
+                "address": shelter.address,
+                "lat": shelter.lat,
+                "lon": shelter.lon,
+                "distance": distance,
+                "current_temperature": temp,
+                "current_occupancy": occupancy,
+            }
+        )
+    return recommendations
+
+
+# 나이와 이름 기반 적합한 쉼터 추천 함수
+@timed("get_recommended_shelter")
+def get_recommended_shelter(user_lat, user_lon, user_age, user_name):
+    """나이와 이름을 기반으로 가장 적합한 쉼터 추천"""
+    if not user_lat or not user_lon:
+        return "위치 정보를 입력해주세요.", None, None, None
+
+    if not user_age or not user_name:
+        return "나이와 이름을 입력해주세요.", None, None, None
+
+    try:
+        user_age = int(user_age)
+    except ValueError:
+        return "올바른 나이를 입력해주세요.", None, None, None
+
+    # 운영 중이고 나이 기준에 맞는 가장 가까운 쉼터 선택
+    with stage("recommend.rank"):
+        recommendations = get_recommended_shelters(
+            user_lat, user_lon, user_age, top_n=1
+        )
+    if not recommendations:
+        return "주변에 적합한 쉼터가 없습니다.", None, None, None
+
+    best = recommendations[0]
+    distance = best["distance"]
 
     # 실시간 온도 및 사용자 수 처리
-    current_temp = row.get("current_temperature")
-    current_occupancy = row.get("current_occupancy")
+    current_temp = best["current_temperature"]
+    current_occupancy = best["current_occupancy"]
 
     if pd.isna(current_temp):
         temp_display = "정보없음"
     else:
-        temp_display = f"{current_temp}°C"
+        temp_display = f"{_format_number(current_temp)}°C"
 
     if pd.isna(current_occupancy):
         occupancy_display = "정보없음"
     else:
-        occupancy_display = f"{current_occupancy}명"
+        occupancy_display = f"{_format_number(current_occupancy)}명"
 
     # 추천 텍스트 생성
-    recommendation_text = f"선생님께 가장 적합한 쉼터는 {row['쉼터명칭']} 입니다. 현 위치로부터 {distance:.1f}km 거리에 있습니다. 현재 온도 {temp_display}, 현재 사용자 수 {occupancy_display}로 운영 중입니다."
+    recommendation_text = f"선생님께 가장 적합한 쉼터는 {best['name']} 입니다. 현 위치로부터 {distance:.1f}km 거리에 있습니다. 현재 온도 {temp_display}, 현재 사용자 수 {occupancy_display}로 운영 중입니다."
+
+    return recommendation_text, best["name"], best["lat"], best["lon"]
+
+
+# JSON API용 조회 (지도/카드 렌더링 없이 값만 반환)
+def _json_values(values):
+    """배열/Series를 JSON으로 바꿀 수 있는 파이썬 값 리스트로 변환 (결측값은 None)"""
+    series = pd.Series(values)
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def shelter_records(dataset, positions, distances):
+    """행 위치들의 쉼터 정보를 dict 리스트로 반환 (순서는 positions 순서)"""
+    store = dataset.store
+    temps, occupancies = live_status(dataset, positions)
+    columns = {
+        "id": dataset.shelter_ids[positions],
+        "name": store.text("name", positions),
+        "type": store.text("type", positions),
+        "address": store.text("address", positions),
+        "district": store.text("district", positions),
+        "lat": store.numeric("lat", positions),
+        "lon": store.numeric("lon", positions),
+        "distance_km": np.round(distances, 3),
+        "area_m2": store.numeric("area", positions),
+        "capacity": pd.array(store.numeric("capacity", positions), dtype="Int64"),
+        "fan": store.text("fan", positions).astype(str) == "있음",
+        "ac": store.text("ac", positions).astype(str) == "있음",
+        "current_temperature": temps,
+        "current_occupancy": occupancies,
+        "operating": ~((temps >= 30) & (occupancies == 0)),
+    }
+    values = [_json_values(np.asarray(column)) for column in columns.values()]
+    return [dict(zip(columns, row)) for row in zip(*values)]
 
-    return recommendation_text, row["쉼터명칭"], row["위도"], row["경도"]
+
+def nearby_records(
+    user_lat,
+    user_lon,
+    facility_type=ALL_VALUE,
+    area_size=ALL_VALUE,
+    capacity_size=ALL_VALUE,
+    has_fan_filter=ALL_VALUE,
+    has_ac_filter=ALL_VALUE,
+    district=ALL_VALUE,
+    radius_km=None,
+    limit=None,
+    offset=0,
+):
+    """주변 쉼터 검색 결과를 JSON으로 바꿀 수 있는 dict로 반환
+
+    반경 안에 쉼터가 없으면 get_nearby_shelters와 같이 반경을 넓혀 검색하며,
+    실제 검색 반경과 반경 내 전체 개수를 함께 반환한다. limit을 주지 않으면
+    NEARBY_CONFIG["limit"]개까지 반환한다.
+    """
+    if limit is None:
+        limit = NEARBY_CONFIG["limit"]
+    dataset = get_dataset()
+    conditions = filter_conditions(
+        facility_type, area_size, capacity_size, has_fan_filter, has_ac_filter, district
+    )
+    selected = dataset.filter_index.mask(conditions)
+    positions, distances, total, searched_km = search_nearby(
+        dataset,
+        selected,
+        user_lat,
+        user_lon,
+        radius_km,
+        offset + limit,
+        conditions=conditions,
+    )
+    return {
+        "radius_km": float(searched_km),
+        "total": int(total),
+        "offset": offset,
+        "shelters": shelter_records(dataset, positions[offset:], distances[offset:]),
+    }
+
+
+def recommendation_records(user_lat, user_lon, user_age, top_n=3):
+    """나이 기준 추천 쉼터를 JSON으로 바꿀 수 있는 dict 리스트로 반환"""
+    dataset = get_dataset()
+    positions, distances = rank_shelters(
+        user_lat, user_lon, int(user_age), top_n, dataset
+    )
+    return shelter_records(dataset, positions, distances)
+
+
+def batch_nearest_records(user_lats, user_lons, user_ages, top_n=1, workers=None):
+    """위치별 가까운 운영 중 쉼터 목록을 JSON으로 바꿀 수 있는 리스트로 반환"""
+    dataset = get_dataset()
+    positions, distances = rank_shelters_batch(
+        user_lats, user_lons, user_ages, top_n, dataset, workers
+    )
+    ids = dataset.shelter_ids
+    names = _json_values(dataset.store.text("name"))
+    lats = _json_values(dataset.store.numeric("lat"))
+    lons = _json_values(dataset.store.numeric("lon"))
+    rounded = np.round(distances, 3).tolist()
+
+    results = []
+    for row_positions, row_distances in zip(positions.tolist(), rounded):
+        results.append(
+            [
+                {
+                    "id": ids[position],
+                    "name": names[position],
+                    "lat": lats[position],
+                    "lon": lons[position],
+                    "distance_km": distance,
+                }
+                for position, distance in zip(row_positions, row_distances)
+                if position >= 0
+            ]
+        )
+    return results
 
 
 # 위치 정보 처리 함수 (자치구 자동 설정 포함)
@@ -656,16 +1763,15 @@ def process_location_json(location_json):
 # 필터 옵션들을 가져오는 함수
 def get_filter_options():
     """필터 드롭다운에 사용할 옵션들을 반환"""
-    df = load_data()
-    df = preprocess_data(df)
+    categories = get_dataset().filter_index.categories
 
     # 필터 옵션들
-    facility_types = ["전체"] + sorted(df["시설구분2"].dropna().unique().tolist())
+    facility_types = ["전체"] + sorted(categories["시설구분2"])
     area_sizes = ["전체", "매우 작음", "작음", "보통", "큼", "매우 큼"]
     capacity_sizes = ["전체", "매우 적음", "적음", "보통", "많음", "매우 많음"]
     fan_options = ["전체", "있음", "없음"]
     ac_options = ["전체", "있음", "없음"]
-    districts = ["전체"] + sorted(df["자치구"].dropna().unique().tolist())
+    districts = ["전체"] + sorted(categories["자치구"])
 
     return {
         "facility_types": facility_types,
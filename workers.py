@@ -0,0 +1,59 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import threading
+
+from config import TELEMETRY_CONFIG, WORKER_CONFIG
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_process_worker():
+    """프로세스 풀 작업자 초기화 (실시간 측정값 피드를 작업자마다 따로 읽음)"""
+    if TELEMETRY_CONFIG["feed_path"]:
+        from telemetry import TelemetryFileFeed, get_telemetry_store
+
+        TelemetryFileFeed(
+            get_telemetry_store(),
+            TELEMETRY_CONFIG["feed_path"],
+            TELEMETRY_CONFIG["poll_interval"],
+        ).start()
+
+
+def get_executor():
+    """조회/렌더링 작업을 실행할 공유 풀 반환 (WORKER_CONFIG 설정으로 처음 호출 시 생성)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if WORKER_CONFIG["pool"] == "process":
+                    _executor = ProcessPoolExecutor(
+                        max_workers=WORKER_CONFIG["max_workers"],
+                        initializer=_init_process_worker,
+                    )
+                else:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=WORKER_CONFIG["max_workers"],
+                        thread_name_prefix="shelter-worker",
+                    )
+    return _executor
+
+
+async def run_in_pool(fn, *args, **kwargs):
+    """fn(*args, **kwargs)를 공유 풀에서 실행하고 결과를 기다림
+
+    이벤트 루프를 막지 않으며, 풀 크기보다 많은 요청은 풀 안에서 차례를 기다린다.
+    프로세스 풀에서는 fn과 인자가 pickle 가능해야 한다 (모듈 수준 함수).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(fn, *args, **kwargs))
+
+
+def shutdown():
+    """풀 종료 (실행 중인 작업은 끝까지 기다림)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None